@@ -0,0 +1,4 @@
+"""Benchmarks for pdf_extract. Run from the repo root, e.g.::
+
+    uv run python -m benchmarks.bench_parallel
+"""
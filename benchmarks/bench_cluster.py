@@ -0,0 +1,90 @@
+"""Rectangle clustering: scaling.
+
+The current ``_cluster_rects`` and the original fixpoint loop (kept below
+as ``_reference_cluster_rects``) are timed at growing rect counts; the
+quadratic reference is skipped above ``--reference-max``. That both give
+identical clusters is checked by ``tests/test_cluster.py``.
+
+Usage:
+    uv run python -m benchmarks.bench_cluster [--sizes 1000 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import fitz
+
+from pdf_extract import _cluster_rects
+
+
+def _reference_cluster_rects(rects: list[fitz.Rect], gap: float = 20.0) -> list[fitz.Rect]:
+    """Original fixpoint implementation, kept as the reference."""
+    if not rects:
+        return []
+    clusters = [fitz.Rect(r) for r in rects]
+    merged = True
+    while merged:
+        merged = False
+        new_clusters: list[fitz.Rect] = []
+        used: set[int] = set()
+        for i, a in enumerate(clusters):
+            if i in used:
+                continue
+            expanded = fitz.Rect(a.x0 - gap, a.y0 - gap, a.x1 + gap, a.y1 + gap)
+            for j in range(i + 1, len(clusters)):
+                if j in used:
+                    continue
+                if expanded.intersects(clusters[j]):
+                    a |= clusters[j]
+                    expanded = fitz.Rect(a.x0 - gap, a.y0 - gap, a.x1 + gap, a.y1 + gap)
+                    used.add(j)
+                    merged = True
+            new_clusters.append(a)
+            used.add(i)
+        clusters = new_clusters
+    return clusters
+
+
+def _random_rects(rng: random.Random, n: int, width: float, height: float, max_size: float) -> list[fitz.Rect]:
+    rects = []
+    for _ in range(n):
+        x = rng.uniform(-50, width)
+        y = rng.uniform(-50, height)
+        rects.append(fitz.Rect(x, y, x + rng.uniform(0.5, max_size), y + rng.uniform(0.5, max_size)))
+    return rects
+
+
+def _time(fn, rects: list[fitz.Rect]) -> tuple[float, int]:
+    start = time.perf_counter()
+    clusters = fn(rects)
+    return time.perf_counter() - start, len(clusters)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 3000, 10000, 30000, 100000])
+    parser.add_argument("--reference-max", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    # "dense": a drawing-sized page, mostly one big cluster;
+    # "sparse": a huge sheet where most rects stay separate.
+    layouts = {"dense": (600, 800), "sparse": (60000, 80000)}
+    print(f"{'rects':>7} {'layout':>7} {'clusters':>9} {'current s':>10} {'reference s':>12}")
+    for n in args.sizes:
+        for layout, (width, height) in layouts.items():
+            rects = _random_rects(rng, n, width, height, 30)
+            elapsed, count = _time(_cluster_rects, rects)
+            if n <= args.reference_max:
+                ref_elapsed, _ = _time(_reference_cluster_rects, rects)
+                ref = f"{ref_elapsed:>12.3f}"
+            else:
+                ref = f"{'-':>12}"
+            print(f"{n:>7} {layout:>7} {count:>9} {elapsed:>10.3f} {ref}")
+
+
+if __name__ == "__main__":
+    main()
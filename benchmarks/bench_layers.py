@@ -0,0 +1,77 @@
+"""Layer mode on pages with many vector clusters.
+
+Compares ``extract_all(..., layers=True)`` against the original per-cluster
+approach (copy, clean and re-tokenize the page twice for every cluster,
+reproduced below). That both produce identical output is checked by
+``tests/test_layers.py``.
+
+Usage:
+    uv run python -m benchmarks.bench_layers [--pages 4] [--grid 2 4 6 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import fitz
+
+from benchmarks.bench_tokenize import _strip_text, _strip_vectors
+from benchmarks.corpus import clustered_document
+from pdf_extract import _padded_clip, _page_drawing_clusters, _render_clip, extract_all
+
+
+def _temp_page(doc: fitz.Document, page_num: int, strip) -> tuple[fitz.Document, fitz.Page]:
+    tmp = fitz.open()
+    tmp.insert_pdf(doc, from_page=page_num, to_page=page_num)
+    page = tmp[0]
+    page.clean_contents()
+    for xref in page.get_contents():
+        tmp.update_stream(xref, strip(tmp.xref_stream(xref)))
+    return tmp, page
+
+
+def _per_cluster_layers(doc: fitz.Document, dpi: int = 200) -> list[tuple[str, bytes]]:
+    """The original layer loop: two temp pages per cluster."""
+    results = []
+    for page_num in range(len(doc)):
+        page = doc[page_num]
+        for img_idx, img in enumerate(page.get_images(full=True)):
+            base = doc.extract_image(img[0])
+            if base:
+                results.append((f"page{page_num + 1}_img{img_idx + 1}.{base['ext']}", base["image"]))
+        for cl_idx, raw_clip in enumerate(_page_drawing_clusters(page)):
+            clip = _padded_clip(raw_clip, page.rect)
+            if clip.width < 15 or clip.height < 15:
+                continue
+            tag = f"page{page_num + 1}_vec{cl_idx + 1}"
+            for suffix, strip in (("vector", _strip_text), ("text", _strip_vectors)):
+                tmp, tmp_page = _temp_page(doc, page_num, strip)
+                results.append((f"{tag}_{suffix}.png", _render_clip(tmp_page, clip, dpi)))
+                tmp.close()
+    return results
+
+
+def _time(fn, doc: fitz.Document) -> float:
+    start = time.perf_counter()
+    fn(doc)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--grid", type=int, nargs="+", default=[2, 4, 6, 8])
+    args = parser.parse_args()
+
+    print(f"{'clusters/page':>14} {'per-cluster s':>14} {'per-page s':>11} {'speedup':>8}")
+    for grid in args.grid:
+        doc = fitz.open(stream=clustered_document(args.pages, grid), filetype="pdf")
+        old_time = _time(_per_cluster_layers, doc)
+        new_time = _time(lambda d: extract_all(d, layers=True), doc)
+        doc.close()
+        print(f"{grid * grid:>14} {old_time:>14.2f} {new_time:>11.2f} {old_time / new_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
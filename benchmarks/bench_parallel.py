@@ -0,0 +1,54 @@
+"""Scaling of ``extract_all(..., workers=N)`` with core count.
+
+Usage:
+    uv run python -m benchmarks.bench_parallel [--pages 120] [--layers]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import fitz
+
+from benchmarks.corpus import mixed_document
+from pdf_extract import extract_all
+
+
+def _time(pdf_bytes: bytes, *, workers: int, layers: bool) -> tuple[float, list[str]]:
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    start = time.perf_counter()
+    results = extract_all(doc, layers=layers, workers=workers)
+    elapsed = time.perf_counter() - start
+    doc.close()
+    return elapsed, [name for name, _ in results]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--layers", action="store_true")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+    pdf_bytes = mixed_document(args.pages)
+    print(f"{args.pages} pages, layers={args.layers}, {cpus} CPU(s)")
+    print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+
+    baseline_time, baseline_names = _time(pdf_bytes, workers=1, layers=args.layers)
+    for workers in counts:
+        if workers == 1:
+            elapsed, names = baseline_time, baseline_names
+        else:
+            elapsed, names = _time(pdf_bytes, workers=workers, layers=args.layers)
+            assert names == baseline_names, "parallel output differs from serial"
+        print(
+            f"{workers:>8} {elapsed:>9.2f} {args.pages / elapsed:>9.1f} "
+            f"{baseline_time / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
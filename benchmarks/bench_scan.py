@@ -0,0 +1,62 @@
+"""Drawing scan: get_drawings() path dicts vs the content-stream bbox scanner.
+
+For each page of a drawing-heavy document, times ``_page_drawing_clusters``
+in both modes and repeats the call under tracemalloc (which slows it down,
+so it isn't timed) to record peak Python memory. That both modes give the
+same clusters is checked by ``tests/test_scan.py``.
+
+Usage:
+    uv run python -m benchmarks.bench_scan [--pages 3] [--paths 2000 10000 30000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import fitz
+
+from benchmarks.corpus import drawing_document
+from pdf_extract import _page_drawing_clusters
+
+
+def _measure(page: fitz.Page, bbox_scan: bool) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    clusters = _page_drawing_clusters(page, bbox_scan=bbox_scan)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    _page_drawing_clusters(page, bbox_scan=bbox_scan)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(clusters)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--paths", type=int, nargs="+", default=[2000, 10000, 30000])
+    args = parser.parse_args()
+
+    print(f"{'paths/page':>10} {'mode':>9} {'ms/page':>9} {'peak MiB':>9} {'clusters':>9}")
+    for paths in args.paths:
+        doc = fitz.open(stream=drawing_document(args.pages, paths), filetype="pdf")
+        for mode, bbox_scan in (("drawings", False), ("scan", True)):
+            total_time = 0.0
+            peak = 0
+            clusters = 0
+            for page in doc:
+                elapsed, page_peak, count = _measure(page, bbox_scan)
+                total_time += elapsed
+                peak = max(peak, page_peak)
+                clusters += count
+            print(
+                f"{paths:>10} {mode:>9} {1000 * total_time / len(doc):>9.1f} "
+                f"{peak / 2**20:>9.2f} {clusters / len(doc):>9.1f}"
+            )
+        doc.close()
+
+
+if __name__ == "__main__":
+    main()
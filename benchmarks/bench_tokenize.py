@@ -0,0 +1,189 @@
+"""Content-stream tokenizer throughput.
+
+Times the original byte-at-a-time tokenizer (kept below as
+``_reference_tokenize``) against the current ``_tokenize``, and the layer
+split built on the reference tokenizer against ``_split_layers``, on a
+drawing-heavy stream. ``_strip_text`` and ``_strip_vectors`` are the
+original one-layer filters, which ``benchmarks.bench_layers`` reproduces the
+old layer loop with. Their equivalence is checked by
+``tests/test_tokenize.py``.
+
+Usage:
+    uv run python -m benchmarks.bench_tokenize [--mb 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from pdf_extract import _PAINT_OPS, _split_layers, _tokenize
+
+
+def _reference_tokenize(stream: bytes):
+    """Original byte-at-a-time tokenizer, kept as the reference implementation.
+
+    token_type is one of: "ws", "string", "hexstring", "token".
+    Every byte of the input is accounted for in the output so that
+    b"".join(raw for raw, _ in _tokenize(stream)) == stream.
+    """
+    i = 0
+    n = len(stream)
+    WS = b" \n\r\t\x00\x0c"
+    DELIMS = b"()<>[]{}/%"
+
+    while i < n:
+        c = stream[i : i + 1]
+
+        # --- whitespace run ---
+        if c[0] in WS:
+            start = i
+            while i < n and stream[i : i + 1][0] in WS:
+                i += 1
+            yield stream[start:i], "ws"
+            continue
+
+        # --- string literal (...) ---
+        if c == b"(":
+            start = i
+            depth = 1
+            i += 1
+            while i < n and depth > 0:
+                ch = stream[i : i + 1]
+                if ch == b"\\":
+                    i += 2
+                    continue
+                if ch == b"(":
+                    depth += 1
+                elif ch == b")":
+                    depth -= 1
+                i += 1
+            yield stream[start:i], "string"
+            continue
+
+        # --- hex string <...> (not dict <<) ---
+        if c == b"<" and stream[i + 1 : i + 2] != b"<":
+            start = i
+            i = stream.index(b">", i) + 1
+            yield stream[start:i], "hexstring"
+            continue
+
+        # --- comment %... ---
+        if c == b"%":
+            start = i
+            while i < n and stream[i : i + 1] not in (b"\n", b"\r"):
+                i += 1
+            yield stream[start:i], "ws"  # treat comments as whitespace
+            continue
+
+        # --- everything else: operator / operand token ---
+        # includes numbers, names (/Foo), booleans, dict delims, arrays, operators
+        start = i
+        if c == b"/" or c == b"[" or c == b"]":
+            # name or array delimiters — scan until next delimiter/ws
+            i += 1
+            if c == b"/":
+                while i < n and stream[i : i + 1][0] not in WS and stream[i : i + 1][0] not in DELIMS:
+                    i += 1
+        elif stream[i : i + 2] in (b"<<", b">>"):
+            i += 2
+        else:
+            i += 1
+            while i < n and stream[i : i + 1][0] not in WS and stream[i : i + 1][0] not in DELIMS:
+                i += 1
+
+        yield stream[start:i], "token"
+
+
+def _strip_text(stream: bytes) -> bytes:
+    """Remove BT … ET text blocks from a content stream."""
+    result = bytearray()
+    in_text = False
+    for raw, ttype in _tokenize(stream):
+        if ttype == "token":
+            if raw == b"BT":
+                in_text = True
+                continue
+            if raw == b"ET":
+                in_text = False
+                continue
+        if not in_text:
+            result.extend(raw)
+    return bytes(result)
+
+
+def _strip_vectors(stream: bytes) -> bytes:
+    """Neutralise path-painting operators (replace with ``n``) so vectors vanish."""
+    result = bytearray()
+    for raw, ttype in _tokenize(stream):
+        if ttype == "token" and raw in _PAINT_OPS:
+            result.extend(b"n")
+        else:
+            result.extend(raw)
+    return bytes(result)
+
+
+def _reference_split_layers(stream: bytes) -> tuple[bytes, bytes]:
+    """The original ``_split_layers``: token by token, on the reference tokenizer."""
+    no_text = bytearray()
+    no_vectors = bytearray()
+    in_text = False
+    for raw, ttype in _reference_tokenize(stream):
+        if ttype == "token":
+            if raw == b"BT" or raw == b"ET":
+                in_text = raw == b"BT"
+                no_vectors.extend(raw)
+                continue
+            if raw in _PAINT_OPS:
+                no_vectors.extend(b"n")
+                if not in_text:
+                    no_text.extend(raw)
+                continue
+        no_vectors.extend(raw)
+        if not in_text:
+            no_text.extend(raw)
+    return bytes(no_text), bytes(no_vectors)
+
+
+def _sample_stream(size: int) -> bytes:
+    """A drawing-heavy content stream of roughly *size* bytes."""
+    rng = random.Random(1)
+    out = bytearray(b"q 1 0 0 1 0 0 cm\n")
+    while len(out) < size:
+        x, y = rng.uniform(0, 600), rng.uniform(0, 800)
+        out += b"%.2f %.2f m %.2f %.2f l %.2f %.2f %.2f %.2f re S\n" % (
+            x, y, x + 10, y + 10, x, y, 20, 20,
+        )
+        if rng.random() < 0.2:
+            out += b"BT /F1 9 Tf %.2f %.2f Td (Label \\(x\\)) Tj ET\n" % (x, y)
+    out += b"Q\n"
+    return bytes(out)
+
+
+def _throughput(fn, stream: bytes) -> float:
+    start = time.perf_counter()
+    for _ in fn(stream):
+        pass
+    return len(stream) / (time.perf_counter() - start) / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=4)
+    args = parser.parse_args()
+
+    stream = _sample_stream(int(args.mb * 1e6))
+    for label, reference, current in (
+        ("tokenize", _reference_tokenize, _tokenize),
+        ("split layers", _reference_split_layers, _split_layers),
+    ):
+        ref = _throughput(reference, stream)
+        new = _throughput(current, stream)
+        print(f"{label}")
+        print(f"  reference: {ref:8.2f} MB/s")
+        print(f"  current:   {new:8.2f} MB/s  ({new / ref:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
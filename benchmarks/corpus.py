@@ -0,0 +1,143 @@
+"""Deterministic synthetic PDFs for benchmarking.
+
+Everything is generated in memory with fitz from a fixed seed, so repeated
+runs (and runs on different machines) measure the same documents.
+"""
+
+from __future__ import annotations
+
+import random
+
+import fitz
+
+
+def _noise_pixmap(rng: random.Random, width: int, height: int) -> fitz.Pixmap:
+    """An RGB pixmap filled with seeded noise (so it doesn't compress away)."""
+    samples = rng.randbytes(width * height * 3)
+    return fitz.Pixmap(fitz.csRGB, width, height, samples, False)
+
+
+def _draw_figure(page: fitz.Page, rng: random.Random, area: fitz.Rect, paths: int) -> None:
+    """Draw *paths* random lines/rects inside *area*."""
+    shape = page.new_shape()
+    for _ in range(paths):
+        x0 = rng.uniform(area.x0, area.x1 - 10)
+        y0 = rng.uniform(area.y0, area.y1 - 10)
+        x1 = min(area.x1, x0 + rng.uniform(6, 60))
+        y1 = min(area.y1, y0 + rng.uniform(6, 60))
+        if rng.random() < 0.5:
+            shape.draw_rect(fitz.Rect(x0, y0, x1, y1))
+        else:
+            shape.draw_line((x0, y0), (x1, y1))
+        shape.finish(color=(0, 0, 0), fill=None, width=0.8)
+    shape.commit()
+
+
+def scanned_document(pages: int = 10, seed: int = 0) -> bytes:
+    """Image-heavy pages: one large full-page raster per page, like a scan."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=_noise_pixmap(rng, 850, 1100))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def mixed_document(pages: int = 50, seed: int = 0) -> bytes:
+    """A many-page document with one raster image, two figures and text per page."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(50, 50, 250, 200), pixmap=_noise_pixmap(rng, 160, 120))
+        _draw_figure(page, rng, fitz.Rect(300, 60, 550, 300), paths=40)
+        _draw_figure(page, rng, fitz.Rect(60, 420, 540, 760), paths=80)
+        page.insert_text((300, 330), f"Figure {i + 1}: synthetic drawing", fontsize=10)
+        page.insert_text((80, 440), "Label A   Label B   Label C", fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def clustered_document(pages: int = 5, grid: int = 5, seed: int = 0) -> bytes:
+    """Pages tiled with *grid* x *grid* separate labelled figures (many clusters per page)."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        cell_w = (page.rect.width - 60) / grid
+        cell_h = (page.rect.height - 60) / grid
+        for row in range(grid):
+            for col in range(grid):
+                x0 = 30 + col * cell_w
+                y0 = 30 + row * cell_h
+                # leave more than the clustering gap between neighbouring cells
+                area = fitz.Rect(x0 + 15, y0 + 15, x0 + cell_w - 15, y0 + cell_h - 15)
+                _draw_figure(page, rng, area, paths=12)
+                page.insert_text((area.x0 + 2, area.y0 + 10), f"R{row}C{col}", fontsize=7)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def drawing_document(pages: int = 3, paths: int = 5000, seed: int = 0) -> bytes:
+    """Engineering-drawing style pages: thousands of small paths in a few regions."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        regions = [fitz.Rect(40, 40, 290, 400), fitz.Rect(320, 40, 560, 400), fitz.Rect(40, 440, 560, 800)]
+        for area in regions:
+            _draw_figure(page, rng, area, paths=paths // len(regions))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def repeated_logo_document(pages: int = 30, seed: int = 0) -> bytes:
+    """Letterhead pages: one shared logo image and an identical vector header
+    on every page, plus a per-page figure and a page-numbered footer."""
+    rng = random.Random(seed)
+    logo = _noise_pixmap(rng, 120, 60)
+    doc = fitz.open()
+    logo_xref = 0
+    for i in range(pages):
+        page = doc.new_page()
+        if logo_xref:
+            page.insert_image(fitz.Rect(40, 30, 160, 90), xref=logo_xref)
+        else:
+            logo_xref = page.insert_image(fitz.Rect(40, 30, 160, 90), pixmap=logo)
+        header = page.new_shape()
+        header.draw_rect(fitz.Rect(200, 35, 560, 85))
+        header.draw_line((210, 75), (550, 75))
+        header.finish(color=(0.1, 0.2, 0.6), fill=(0.9, 0.9, 1.0), width=1.5)
+        header.commit()
+        page.insert_text((215, 65), "ACME Engineering Ltd.", fontsize=14)
+        _draw_figure(page, rng, fitz.Rect(60, 150, 540, 600), paths=30)
+        footer = page.new_shape()
+        footer.draw_rect(fitz.Rect(250, 780, 350, 810))
+        footer.finish(color=(0, 0, 0), width=1)
+        footer.commit()
+        page.insert_text((270, 800), f"Page {i + 1}", fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def text_over_vector_document(pages: int = 10, seed: int = 0) -> bytes:
+    """Diagrams with dense text labels drawn on top of the vectors."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        for area in (fitz.Rect(50, 60, 545, 380), fitz.Rect(50, 440, 545, 780)):
+            _draw_figure(page, rng, area, paths=150)
+            for _ in range(40):
+                x = rng.uniform(area.x0, area.x1 - 60)
+                y = rng.uniform(area.y0 + 10, area.y1)
+                page.insert_text((x, y), f"N{rng.randint(100, 999)}", fontsize=7)
+    data = doc.tobytes()
+    doc.close()
+    return data
@@ -0,0 +1,158 @@
+"""Reproducible per-stage benchmark suite for pdf_extract.
+
+Generates a deterministic corpus (see ``benchmarks.corpus``), then for each
+document and both ``layers`` modes runs ``extract_all`` with instrumentation
+hooks (``pdf_extract.ExtractHooks``) and records the time of each stage:
+
+- ``images``     extract_image for embedded images
+- ``scan``       get_drawings (vector path data) + size filters
+- ``cluster``    _cluster_rects
+- ``strip``      layer mode only: building the vector/text page variants
+- ``render``     get_pixmap for every cluster clip
+- ``encode``     PNG encoding of those pixmaps
+- ``total``      extract_all end to end
+
+Each figure is the best of ``--repeat`` runs. Results are written as JSON;
+``--compare`` reports stages that got slower than a previous run by more
+than ``--threshold`` and exits non-zero if there are any.
+
+Usage:
+    uv run python -m benchmarks.suite --out bench.json
+    uv run python -m benchmarks.suite --out new.json --compare bench.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+
+import fitz
+
+from benchmarks import corpus
+from pdf_extract import ExtractHooks, extract_all
+
+STAGES = ("images", "scan", "cluster", "strip", "render", "encode", "total")
+
+# Stage timings below this many seconds are too noisy to flag.
+_MIN_FLAG_SECONDS = 0.005
+
+
+def _corpus(quick: bool) -> dict[str, bytes]:
+    scale = 1 if quick else 4
+    return {
+        "scanned": corpus.scanned_document(pages=2 * scale),
+        "vector_dense": corpus.drawing_document(pages=scale, paths=3000),
+        "text_over_vector": corpus.text_over_vector_document(pages=2 * scale),
+        "many_pages": corpus.mixed_document(pages=25 * scale),
+        "repeated_logo": corpus.repeated_logo_document(pages=10 * scale),
+    }
+
+
+class _StageClock(ExtractHooks):
+    def __init__(self) -> None:
+        self.times = dict.fromkeys(STAGES, 0.0)
+
+    def stage(self, name: str, seconds: float) -> None:
+        self.times[name] += seconds
+
+
+def _stage_times(doc: fitz.Document, *, layers: bool, dpi: int = 200) -> dict[str, float]:
+    """Run extract_all once, collecting per-stage times from its hooks."""
+    clock = _StageClock()
+    t = time.perf_counter()
+    extract_all(doc, dpi=dpi, layers=layers, hooks=clock)
+    clock.times["total"] = time.perf_counter() - t
+    return clock.times
+
+
+def _best_of(repeat: int, fn: Callable[[], dict[str, float]]) -> dict[str, float]:
+    runs = [fn() for _ in range(repeat)]
+    return {stage: min(run[stage] for run in runs) for stage in STAGES}
+
+
+def run(quick: bool, repeat: int) -> dict:
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name, pdf_bytes in _corpus(quick).items():
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        results[name] = {
+            "pages": len(doc),
+            "combined": _best_of(repeat, lambda: _stage_times(doc, layers=False)),
+            "layers": _best_of(repeat, lambda: _stage_times(doc, layers=True)),
+        }
+        doc.close()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "machine": platform.machine(),
+            "quick": quick,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Return a line for every stage that is slower than *old* by more than *threshold*."""
+    regressions = []
+    for doc_name, modes in new["results"].items():
+        for mode in ("combined", "layers"):
+            before = old["results"].get(doc_name, {}).get(mode)
+            if not before:
+                continue
+            for stage in STAGES:
+                was, now = before.get(stage, 0.0), modes[mode][stage]
+                if now < _MIN_FLAG_SECONDS or was <= 0:
+                    continue
+                if now > was * (1 + threshold):
+                    regressions.append(
+                        f"{doc_name}/{mode}/{stage}: {was * 1000:.1f} ms -> {now * 1000:.1f} ms "
+                        f"(+{(now / was - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def _print_table(report: dict) -> None:
+    print(f"{'document':<18} {'mode':<9}" + "".join(f"{s:>10}" for s in STAGES))
+    for doc_name, modes in report["results"].items():
+        for mode in ("combined", "layers"):
+            cells = "".join(f"{modes[mode][s] * 1000:>10.1f}" for s in STAGES)
+            print(f"{doc_name:<18} {mode:<9}{cells}")
+    print("(milliseconds, best of %d)" % report["meta"]["repeat"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="previous JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (default: 0.15 = 15%%)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="smaller corpus for a fast sanity run")
+    args = parser.parse_args()
+
+    report = run(args.quick, args.repeat)
+    _print_table(report)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
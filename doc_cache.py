@@ -0,0 +1,84 @@
+"""Short-lived in-memory store of opened PDFs between /inspect and /render.
+
+``/inspect`` opens a document, builds its manifest and keeps both here
+under a random id, so the follow-up ``/render`` calls don't upload or parse
+the PDF again. Entries expire *ttl* seconds after their last use and the
+store is bounded by document count and total PDF size. Nothing is written
+to disk.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import fitz
+
+
+class CachedDocument:
+    def __init__(self, doc: fitz.Document, size: int, manifest: dict) -> None:
+        self.id = secrets.token_urlsafe(16)
+        self.doc = doc
+        self.size = size
+        self.manifest = manifest
+        # MuPDF documents must not be used from two threads at once
+        self.lock = threading.Lock()
+        self.expires = 0.0
+
+
+class DocumentCache:
+    def __init__(self, *, max_docs: int, max_bytes: int, ttl: float) -> None:
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedDocument] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, entry: CachedDocument) -> None:
+        """Store *entry*, evicting least recently used documents to fit.
+
+        Evicted documents aren't closed here: a render may still be using
+        one, and it is released once the last reference goes away.
+        """
+        with self._lock:
+            self._purge_expired()
+            entry.expires = time.monotonic() + self.ttl
+            self._entries[entry.id] = entry
+            self._size += entry.size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_docs or self._size > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def get(self, doc_id: str) -> CachedDocument | None:
+        """Return the document for *doc_id* and extend its lifetime."""
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(doc_id)
+            if entry is not None:
+                entry.expires = time.monotonic() + self.ttl
+                self._entries.move_to_end(doc_id)
+            return entry
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for doc_id in [k for k, e in self._entries.items() if e.expires <= now]:
+            self._drop(doc_id)
+
+    def _drop(self, doc_id: str) -> None:
+        self._size -= self._entries.pop(doc_id).size
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._purge_expired()
+            return {
+                "documents": len(self._entries),
+                "bytes": self._size,
+                "max_documents": self.max_docs,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+            }
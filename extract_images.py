@@ -4,21 +4,46 @@
 Usage:
     uv run extract_images.py input.pdf [output_dir]
     uv run extract_images.py --layers input.pdf [output_dir]
+    uv run extract_images.py --jobs 8 input.pdf [output_dir]
+    uv run extract_images.py --bbox-scan input.pdf [output_dir]
+    uv run extract_images.py --dedup input.pdf [output_dir]
+    uv run extract_images.py --pages 3-5 --kinds images input.pdf [output_dir]
+    uv run extract_images.py --format jpeg --quality 80 --max-pixels 4000000 input.pdf [output_dir]
+    uv run extract_images.py --batch --jobs 8 [--out DIR] folder/ 'more/**/*.pdf' ...
 """
 # /// script
 # requires-python = ">=3.10"
 # dependencies = ["pymupdf"]
 # ///
 
+import argparse
+import glob
+import json
+import os
 import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import fitz  # pymupdf
 
-from pdf_extract import extract_all
+from pdf_extract import KINDS, RENDER_FORMATS, check_options, iter_extract, parse_pages
 
 
-def main(pdf_path: str, output_dir: str | None = None, *, layers: bool = False) -> None:
+def main(
+    pdf_path: str,
+    output_dir: str | None = None,
+    *,
+    layers: bool = False,
+    jobs: int = 1,
+    bbox_scan: bool = False,
+    dedup: bool = False,
+    pages: str | None = None,
+    kinds: frozenset[str] = KINDS,
+    **render_options,
+) -> None:
     pdf = Path(pdf_path)
     if not pdf.exists():
         print(f"Error: {pdf_path} not found")
@@ -27,25 +52,264 @@ def main(pdf_path: str, output_dir: str | None = None, *, layers: bool = False)
     out = Path(output_dir) if output_dir else pdf.parent / f"{pdf.stem}_images"
     out.mkdir(parents=True, exist_ok=True)
 
+    # Write each item as soon as it is produced so memory stays flat
+    # regardless of document size.
+    count = 0
     doc = fitz.open(pdf_path)
-    images = extract_all(doc, layers=layers)
-    doc.close()
+    try:
+        try:
+            selected = parse_pages(pages, len(doc)) if pages else None
+            items = iter_extract(
+                doc, layers=layers, workers=jobs, bbox_scan=bbox_scan, dedup=dedup,
+                pages=selected, kinds=kinds, **render_options,
+            )
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        for filename, data in items:
+            (out / filename).write_bytes(data)
+            print(f"  Saved {filename} ({len(data)} bytes)")
+            count += 1
+    finally:
+        doc.close()
 
-    for filename, data in images:
-        (out / filename).write_bytes(data)
-        print(f"  Saved {filename} ({len(data)} bytes)")
+    print(f"\nExtracted {count} item(s) to {out}/")
 
-    print(f"\nExtracted {len(images)} item(s) to {out}/")
+
+# Written into a file's output directory once all of its items are saved;
+# batch runs skip files whose marker matches the source and options.
+DONE_MARKER = ".pdfpeel-done.json"
+
+
+def _collect_inputs(patterns: list[str]) -> Iterator[tuple[Path, Path]]:
+    """Yield ``(pdf, base)`` for every PDF named by *patterns*.
+
+    A pattern is a file, a directory (searched recursively) or a glob
+    (``**`` allowed). *base* is what the output layout is relative to.
+    """
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            for pdf in sorted(path.rglob("*")):
+                if pdf.suffix.lower() == ".pdf" and pdf.is_file():
+                    yield pdf, path
+        elif path.is_file():
+            yield path, path.parent
+        else:
+            for match in sorted(glob.glob(pattern, recursive=True)):
+                pdf = Path(match)
+                if pdf.suffix.lower() == ".pdf" and pdf.is_file():
+                    yield pdf, pdf.parent
+
+
+def _marker(pdf: Path, options: dict) -> dict:
+    stat = pdf.stat()
+    return {
+        "source": str(pdf),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "options": {k: sorted(v) if isinstance(v, frozenset) else v for k, v in options.items()},
+    }
+
+
+def _is_complete(out: Path, marker: dict) -> bool:
+    try:
+        done = json.loads((out / DONE_MARKER).read_text())
+    except (OSError, ValueError):
+        return False
+    return all(done.get(k) == v for k, v in marker.items())
+
+
+def _extract_file(pdf: Path, out: Path, pages: str | None, options: dict) -> tuple[int, int, int]:
+    """Extract one PDF into *out*; returns (pages, items, bytes written)."""
+    marker = _marker(pdf, {"pages": pages, **options})
+    items = written = 0
+    doc = fitz.open(pdf)
+    try:
+        selected = parse_pages(pages, len(doc)) if pages else None
+        page_count = len(selected) if selected else len(doc)
+        out.mkdir(parents=True, exist_ok=True)
+        (out / DONE_MARKER).unlink(missing_ok=True)
+        for filename, data in iter_extract(doc, pages=selected, **options):
+            (out / filename).write_bytes(data)
+            items += 1
+            written += len(data)
+    finally:
+        doc.close()
+    tmp = out / (DONE_MARKER + ".tmp")
+    tmp.write_text(json.dumps({**marker, "pages": page_count, "items": items}))
+    os.replace(tmp, out / DONE_MARKER)
+    return page_count, items, written
+
+
+def batch(
+    patterns: list[str],
+    out_root: str | None = None,
+    *,
+    jobs: int = 1,
+    pages: str | None = None,
+    **options,
+) -> int:
+    """Extract every PDF matched by *patterns* on *jobs* worker processes.
+
+    Each PDF goes to ``<stem>_images`` next to it, or under *out_root*
+    mirroring its path below the directory it was found in. Files whose
+    output is already complete are skipped, so an interrupted run can be
+    restarted. Returns the number of files that failed.
+    """
+    tasks: list[tuple[Path, Path]] = []
+    claimed: set[Path] = set()
+    skipped = 0
+    for pdf, base in _collect_inputs(patterns):
+        if out_root:
+            out = Path(out_root) / pdf.parent.relative_to(base) / f"{pdf.stem}_images"
+        else:
+            out = pdf.parent / f"{pdf.stem}_images"
+        if out in claimed:  # same name from two inputs
+            n = 2
+            while out.with_name(f"{out.name}_{n}") in claimed:
+                n += 1
+            out = out.with_name(f"{out.name}_{n}")
+        claimed.add(out)
+        if _is_complete(out, _marker(pdf, {"pages": pages, **options})):
+            skipped += 1
+            continue
+        tasks.append((pdf, out))
+
+    print(f"{len(tasks)} file(s) to extract, {skipped} already done")
+    start = time.perf_counter()
+    done_files = failed = total_pages = 0
+    total_mb = 0.0
+    workers = max(1, jobs)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # A bounded window keeps tens of thousands of files from all being
+        # queued as futures up front.
+        todo = iter(tasks)
+        running: dict[Future, Path] = {}
+
+        def fill() -> None:
+            for pdf, out in todo:
+                running[pool.submit(_extract_file, pdf, out, pages, options)] = pdf
+                if len(running) >= workers * 2:
+                    return
+
+        fill()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in finished:
+                pdf = running.pop(future)
+                try:
+                    page_count, items, _ = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    failed += 1
+                    print(f"  FAILED {pdf}: worker process died")
+                except Exception as exc:
+                    failed += 1
+                    print(f"  FAILED {pdf}: {exc or type(exc).__name__}")
+                else:
+                    done_files += 1
+                    total_pages += page_count
+                    total_mb += pdf.stat().st_size / (1024 * 1024)
+                    print(f"  {pdf}: {page_count} page(s), {items} item(s)")
+            if broken:
+                # A worker crashed (segfault, OOM kill) and took the pool
+                # with it; whatever was in flight is lost. Those files have
+                # no done marker, so a rerun retries them. Carry on with
+                # the rest on a fresh pool.
+                for future, pdf in running.items():
+                    future.cancel()
+                    failed += 1
+                    print(f"  FAILED {pdf}: worker process died")
+                running.clear()
+                pool.shutdown(wait=True)
+                pool = ProcessPoolExecutor(max_workers=workers)
+            fill()
+    finally:
+        pool.shutdown(wait=True)
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(
+        f"\n{done_files} extracted, {skipped} skipped, {failed} failed in {elapsed:.1f}s: "
+        f"{done_files / elapsed:.2f} files/s, {total_pages / elapsed:.1f} pages/s, "
+        f"{total_mb / elapsed:.2f} MB/s"
+    )
+    return failed
 
 
 if __name__ == "__main__":
-    args = sys.argv[1:]
-    use_layers = "--layers" in args
-    if use_layers:
-        args.remove("--layers")
+    parser = argparse.ArgumentParser(
+        usage=(
+            "uv run extract_images.py [--layers] [--jobs N] [--bbox-scan] [--dedup]"
+            " [--pages SPEC] [--kinds images,vectors] [--format png|jpeg|webp] [--quality Q]"
+            " [--png-level N] [--alpha] [--max-pixels N] [--max-doc-pixels N] <input.pdf> [output_dir]\n"
+            "       uv run extract_images.py --batch [--out DIR] [options] <file|dir|glob>..."
+        )
+    )
+    parser.add_argument("paths", nargs="+", metavar="input")
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="extract every PDF in the given files, directories and globs; resumable",
+    )
+    parser.add_argument("--out", metavar="DIR", help="batch mode: write outputs under DIR")
+    parser.add_argument("--layers", action="store_true", help="separate vector/text layers")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, metavar="N",
+        help="worker processes: split pages across (single file) or files across (--batch)",
+    )
+    parser.add_argument(
+        "--bbox-scan", action="store_true",
+        help="find vector regions from a content-stream scan (less memory on drawing-heavy pages)",
+    )
+    parser.add_argument(
+        "--dedup", action="store_true",
+        help="write repeated images/regions once and list every occurrence in manifest.json",
+    )
+    parser.add_argument(
+        "--pages", metavar="SPEC",
+        help="only these pages, e.g. 3-5 or 1,4,10- (default: all)",
+    )
+    parser.add_argument(
+        "--kinds", default="images,vectors", metavar="KINDS",
+        help="comma-separated: images, vectors (default: both)",
+    )
+    parser.add_argument(
+        "--format", choices=RENDER_FORMATS, default="png",
+        help="encoding for rendered vector regions (default: png; webp needs Pillow)",
+    )
+    parser.add_argument("--quality", type=int, default=85, help="jpeg/webp quality 1-100 (default: 85)")
+    parser.add_argument(
+        "--png-level", type=int, metavar="N",
+        help="zlib compression level 0-9 for png (default: MuPDF's)",
+    )
+    parser.add_argument("--alpha", action="store_true", help="transparent background (png/webp)")
+    parser.add_argument(
+        "--max-pixels", type=int, metavar="N",
+        help="render regions larger than N pixels at a lower DPI",
+    )
+    parser.add_argument(
+        "--max-doc-pixels", type=int, metavar="N",
+        help="pixel budget for all rendered regions in the document",
+    )
+    args = parser.parse_args()
 
-    if not args:
-        print("Usage: uv run extract_images.py [--layers] <input.pdf> [output_dir]")
-        sys.exit(1)
+    kinds = frozenset(k.strip() for k in args.kinds.split(",") if k.strip())
+    if not kinds or kinds - KINDS:
+        parser.error(f"--kinds must be a comma-separated subset of: {', '.join(sorted(KINDS))}")
 
-    main(args[0], args[1] if len(args) > 1 else None, layers=use_layers)
+    options = dict(
+        layers=args.layers, bbox_scan=args.bbox_scan, dedup=args.dedup, kinds=kinds,
+        render_format=args.format, quality=args.quality, png_level=args.png_level,
+        alpha=args.alpha, max_pixels=args.max_pixels, doc_pixels=args.max_doc_pixels,
+    )
+    if args.batch:
+        try:
+            check_options(**options)
+        except ValueError as exc:
+            parser.error(str(exc))
+        sys.exit(1 if batch(args.paths, args.out, jobs=args.jobs, pages=args.pages, **options) else 0)
+    if len(args.paths) > 2:
+        parser.error("give one input.pdf and an optional output_dir, or use --batch")
+    main(*args.paths, jobs=args.jobs, pages=args.pages, **options)
@@ -0,0 +1,268 @@
+"""Background extraction jobs for PDFs too large for a synchronous request.
+
+A job is submitted with the PDF bytes, runs on a small in-process thread
+pool, and its finished ZIP is kept in memory until the job's TTL runs out
+after completion. Nothing is written to disk. At most *max_jobs* jobs may
+be queued or running at once; beyond that :meth:`JobManager.submit` raises
+:class:`TooManyJobs`. Kept results are bounded by *max_result_bytes* in
+total: the oldest finished jobs are dropped to make room, and a result
+larger than the whole bound fails its job.
+
+Progress is reported per page through :class:`pdf_extract.ExtractHooks`;
+cancellation goes through a :class:`pdf_extract.Budget`, so a cancelled job
+stops at the next page or cluster. With *prechecks*, each document is first
+run through :func:`pdf_extract.precheck` and the job fails if it's too large.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import fitz
+
+from pdf_extract import (
+    Budget, DocumentTooLarge, ExtractHooks, ExtractionStopped, iter_extract, parse_pages,
+    precheck,
+)
+from zipstream import stream_zip
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class TooManyJobs(Exception):
+    """Raised when the number of queued and running jobs is at the cap."""
+
+
+class Job:
+    def __init__(self, job_id: str, filename: str, ttl: float) -> None:
+        self.id = job_id
+        self.filename = filename
+        self.ttl = ttl
+        self.status = QUEUED
+        self.error: str | None = None
+        self.pages = 0
+        self.page = 0
+        self.items = 0
+        self.result: bytes | None = None
+        self.created = time.time()
+        self.finished: float | None = None
+        self.expires: float | None = None  # monotonic; set on completion
+        self.cancel_requested = threading.Event()
+        self.future: Future | None = None
+
+    def info(self) -> dict[str, Any]:
+        info: dict[str, Any] = {
+            "id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+            "page": self.page,
+            "pages": self.pages,
+            "items": self.items,
+            "created": self.created,
+        }
+        if self.finished is not None:
+            info["finished"] = self.finished
+        elif self.cancel_requested.is_set():
+            info["cancelling"] = True
+        if self.expires is not None:
+            info["expires_in"] = max(0.0, round(self.expires - time.monotonic(), 1))
+        if self.result is not None:
+            info["result_bytes"] = len(self.result)
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class _Progress(ExtractHooks):
+    """Tracks a job's page and item counts."""
+
+    def __init__(self, job: Job) -> None:
+        self.job = job
+
+    def count(self, name: str, value: int) -> None:
+        if name == "pages":
+            self.job.page += value
+        elif name == "items":
+            self.job.items += value
+
+
+class JobManager:
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        max_jobs: int = 4,
+        ttl: float = 600,
+        max_ttl: float = 3600,
+        dpi: int = 200,
+        prechecks: dict[str, int | None] | None = None,
+        max_result_bytes: int | None = None,
+    ) -> None:
+        if workers < 1 or max_jobs < 1:
+            raise ValueError("workers and max_jobs must be >= 1")
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.dpi = dpi
+        self.prechecks = prechecks
+        self.max_result_bytes = max_result_bytes
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="job")
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._result_bytes = 0
+        self._evictions = 0
+
+    def submit(
+        self,
+        pdf_bytes: bytes,
+        *,
+        filename: str = "document.pdf",
+        pages: str | None = None,
+        ttl: float | None = None,
+        **options: Any,
+    ) -> Job:
+        """Queue an extraction of *pdf_bytes* and return its job.
+
+        *options* are passed to :func:`pdf_extract.iter_extract`. *pages* is
+        a page spec for :func:`pdf_extract.parse_pages`, checked once the
+        document is open; an invalid spec fails the job. *ttl* is how long
+        the result is kept after the job finishes; it defaults to the
+        manager's TTL and is capped at ``max_ttl``.
+        """
+        ttl = self.ttl if ttl is None else min(max(ttl, 1.0), self.max_ttl)
+        with self._lock:
+            self._purge_expired()
+            active = sum(1 for job in self._jobs.values() if job.status not in _FINISHED)
+            if active >= self.max_jobs:
+                raise TooManyJobs()
+            job = Job(secrets.token_urlsafe(16), filename, ttl)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, pdf_bytes, pages, options)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = self.get(job_id)
+        if job is None or job.status in _FINISHED:
+            return job
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            # never started: finish it here since _run won't
+            self._finish(job, CANCELLED)
+        return job
+
+    def _run(self, job: Job, pdf_bytes: bytes, pages: str | None, options: dict) -> None:
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        try:
+            try:
+                doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            except fitz.FileDataError:
+                raise ValueError("Could not open the file as a PDF.") from None
+            try:
+                selected = parse_pages(pages, len(doc)) if pages else None
+                if self.prechecks is not None:
+                    precheck(
+                        doc, pages=selected, dpi=self.dpi,
+                        max_pixels=options.get("max_pixels"), **self.prechecks,
+                    )
+                job.pages = len(selected) if selected else len(doc)
+                items = iter_extract(
+                    doc, dpi=self.dpi, pages=selected, hooks=_Progress(job),
+                    budget=Budget(cancel=job.cancel_requested), **options,
+                )
+                result = b"".join(stream_zip(items))
+            finally:
+                doc.close()
+        except ExtractionStopped:
+            self._finish(job, CANCELLED)
+        except DocumentTooLarge as exc:
+            job.error = f"Document is too large: {exc}."
+            self._finish(job, FAILED)
+        except Exception as exc:
+            job.error = str(exc) or type(exc).__name__
+            self._finish(job, FAILED)
+        else:
+            self._finish(job, DONE, result)
+
+    def _finish(self, job: Job, status: str, result: bytes | None = None) -> None:
+        with self._lock:
+            if result is not None:
+                if self._keep(result):
+                    job.result = result
+                    self._result_bytes += len(result)
+                else:
+                    status = FAILED
+                    job.error = (
+                        f"Result ({len(result):,} bytes) is over the limit of "
+                        f"{self.max_result_bytes:,} bytes kept for jobs."
+                    )
+            job.status = status
+            job.finished = time.time()
+            job.expires = time.monotonic() + job.ttl
+
+    def _keep(self, result: bytes) -> bool:
+        """Make room for *result*, dropping the oldest finished results; False if it can't fit."""
+        if self.max_result_bytes is None:
+            return True
+        if len(result) > self.max_result_bytes:
+            return False
+        self._purge_expired()
+        # dicts keep insertion order, so this is oldest submitted first
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.result is not None]:
+            if self._result_bytes + len(result) <= self.max_result_bytes:
+                break
+            self._drop(job_id)
+            self._evictions += 1
+        return True
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job.expires is not None and job.expires <= now
+        ]:
+            self._drop(job_id)
+
+    def _drop(self, job_id: str) -> None:
+        job = self._jobs.pop(job_id)
+        if job.result is not None:
+            self._result_bytes -= len(job.result)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._purge_expired()
+            by_status: dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {
+                "workers": self.workers,
+                "max_jobs": self.max_jobs,
+                "jobs": by_status,
+                "result_bytes": self._result_bytes,
+                "max_result_bytes": self.max_result_bytes,
+                "evictions": self._evictions,
+            }
+
+    def shutdown(self) -> None:
+        for job in list(self._jobs.values()):
+            job.cancel_requested.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
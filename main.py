@@ -1,16 +1,32 @@
-import io
+import asyncio
 import os
-import zipfile
+import time
+from collections.abc import Iterator
+from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import quote
 
 import sentry_sdk
 import fitz  # pymupdf
-from fastapi import FastAPI, File, Form, UploadFile
-from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartParser
 
-from pdf_extract import extract_all
+import metrics
+from doc_cache import CachedDocument, DocumentCache
+from jobs import DONE, JobManager, TooManyJobs
+from pdf_extract import (
+    STOP_PAGES, Budget, DocumentTooLarge, ExtractHooks, ExtractionStopped, check_options, inspect,
+    iter_extract, parse_pages, precheck, render_items,
+)
+from result_cache import ResultCache, cache_key
+from workpool import Abandoned, PoolFull, WorkPool
+from zipstream import ZipWriter, stream_zip
 
 sentry_sdk.init(
     dsn=os.environ.get("GLITCHTIP_DSN", ""),
@@ -18,7 +34,181 @@ sentry_sdk.init(
     send_default_pii=False,
 )
 
+# Extraction runs off the event loop on a bounded pool so one heavy PDF
+# can't stall other requests (or the healthcheck on "/").
+pool = WorkPool(
+    kind=os.environ.get("PDFPEEL_EXECUTOR", "thread"),
+    max_jobs=int(os.environ.get("PDFPEEL_MAX_JOBS", "2")),
+    max_queue=int(os.environ.get("PDFPEEL_MAX_QUEUE", "8")),
+)
+RETRY_AFTER = os.environ.get("PDFPEEL_RETRY_AFTER", "10")
+
+# Finished ZIPs for repeat uploads of the same PDF. Memory-only, and off
+# unless PDFPEEL_CACHE_MB is set.
+cache = ResultCache(
+    max_bytes=int(float(os.environ.get("PDFPEEL_CACHE_MB", "0")) * 1024 * 1024),
+    ttl=float(os.environ.get("PDFPEEL_CACHE_TTL", "600")),
+)
+
+DPI = 200
+
+# Checks run right after a PDF is opened, before anything is extracted,
+# so hopeless documents are refused up front (413, or a failed job). 0
+# means no limit.
+PRECHECKS = {
+    "max_pages": int(os.environ.get("PDFPEEL_MAX_PAGES", "0")) or None,
+    "max_image_pixels": int(os.environ.get("PDFPEEL_MAX_IMAGE_PIXELS", "0")) or None,
+    "max_content_bytes":
+        int(float(os.environ.get("PDFPEEL_MAX_CONTENT_MB", "0")) * 1024 * 1024) or None,
+    "max_memory":
+        int(float(os.environ.get("PDFPEEL_REQUEST_MEMORY_MB", "0")) * 1024 * 1024) or None,
+}
+# With no limit set, precheck() could only measure; skip it entirely.
+PRECHECK = any(limit is not None for limit in PRECHECKS.values())
+
+# Background jobs (POST /jobs) for PDFs that take longer than the proxy's
+# request timeout. They run on their own threads so they can't take every
+# slot from synchronous /extract requests; results stay in memory only.
+job_manager = JobManager(
+    workers=int(os.environ.get("PDFPEEL_JOB_WORKERS", "1")),
+    max_jobs=int(os.environ.get("PDFPEEL_MAX_ASYNC_JOBS", "4")),
+    ttl=float(os.environ.get("PDFPEEL_JOB_TTL", "600")),
+    max_ttl=float(os.environ.get("PDFPEEL_JOB_MAX_TTL", "3600")),
+    dpi=DPI,
+    prechecks=PRECHECKS if PRECHECK else None,
+    max_result_bytes=int(
+        float(os.environ.get("PDFPEEL_JOB_RESULTS_MB", "512")) * 1024 * 1024
+    ) or None,
+)
+
+# Multi-file uploads (POST /extract/batch)
+BATCH_MAX_FILES = int(os.environ.get("PDFPEEL_BATCH_MAX_FILES", "20"))
+BATCH_MAX_BYTES = int(float(os.environ.get("PDFPEEL_BATCH_MAX_MB", "200")) * 1024 * 1024)
+# Documents of one batch extracted at once; by default one less than the
+# pool size, so a batch doesn't take every slot from other requests.
+BATCH_MAX_JOBS = min(
+    int(os.environ.get("PDFPEEL_BATCH_MAX_JOBS", "0")) or max(1, pool.max_jobs - 1),
+    pool.max_jobs,
+)
+
+# Uploads are cut off as soon as they pass the limit and never leave memory:
+# Starlette would spool form files over 1 MB to a temp file on disk, so the
+# in-memory size is raised to the largest body we accept.
+MAX_UPLOAD_BYTES = int(float(os.environ.get("PDFPEEL_MAX_UPLOAD_MB", "100")) * 1024 * 1024)
+_FORM_OVERHEAD = 64 * 1024  # multipart headers and the other form fields
+MultiPartParser.spool_max_size = max(MAX_UPLOAD_BYTES, BATCH_MAX_BYTES) + _FORM_OVERHEAD
+
+# Documents opened by /inspect, kept briefly for follow-up /render calls.
+documents = DocumentCache(
+    max_docs=int(os.environ.get("PDFPEEL_INSPECT_MAX_DOCS", "8")),
+    max_bytes=int(float(os.environ.get("PDFPEEL_INSPECT_MB", "256")) * 1024 * 1024),
+    ttl=float(os.environ.get("PDFPEEL_INSPECT_TTL", "120")),
+)
+MAX_RENDER_DPI = int(os.environ.get("PDFPEEL_MAX_RENDER_DPI", "600"))
+
+# Pixel budgets for rendered regions: per region and per document. A
+# request may ask for less, never more; 0 means no server-side cap.
+MAX_CLIP_PIXELS = int(os.environ.get("PDFPEEL_MAX_CLIP_PIXELS", "0")) or None
+MAX_DOC_PIXELS = int(os.environ.get("PDFPEEL_MAX_DOC_PIXELS", "0")) or None
+
+# Per-request limits for /extract (and each file of /extract/batch), counted
+# from when the request arrives; 0 means no limit. In "partial" mode the
+# ZIP ends with incomplete.json once a limit is hit, in "fail" mode the
+# request fails. Background jobs are not limited.
+TIME_BUDGET = float(os.environ.get("PDFPEEL_TIME_BUDGET", "0")) or None
+PAGE_BUDGET = int(os.environ.get("PDFPEEL_PAGE_BUDGET", "0")) or None
+BUDGET_MODE = os.environ.get("PDFPEEL_BUDGET_MODE", "partial")
+if BUDGET_MODE not in ("partial", "fail"):
+    raise ValueError(f"PDFPEEL_BUDGET_MODE must be 'partial' or 'fail', not {BUDGET_MODE!r}")
+
+# Per-stage timings and sizes for /metrics and Sentry spans. With
+# PDFPEEL_METRICS=0 extraction runs without hooks and skips all timing.
+METRICS = os.environ.get("PDFPEEL_METRICS", "1") not in ("0", "false", "no", "")
+
+registry = metrics.Registry()
+stage_seconds = registry.register(metrics.Histogram(
+    "pdfpeel_stage_seconds",
+    "Time spent per pipeline stage in one /extract request.",
+    metrics.exponential_buckets(0.001, 4, 9),
+    labels=("stage",),
+))
+pages_per_request = registry.register(metrics.Histogram(
+    "pdfpeel_pages", "Pages processed per /extract request.",
+    metrics.exponential_buckets(1, 4, 7),
+))
+clusters_per_request = registry.register(metrics.Histogram(
+    "pdfpeel_clusters", "Vector clusters found per /extract request.",
+    [0] + metrics.exponential_buckets(1, 4, 7),
+))
+pixels_per_request = registry.register(metrics.Histogram(
+    "pdfpeel_rendered_pixels", "Pixels rasterised per /extract request.",
+    metrics.exponential_buckets(1e5, 4, 9),
+))
+bytes_per_request = registry.register(metrics.Histogram(
+    "pdfpeel_output_bytes", "ZIP bytes sent per /extract request.",
+    metrics.exponential_buckets(1024, 4, 11),
+))
+requests_total = registry.register(metrics.Counter(
+    "pdfpeel_requests_total", "/extract requests by outcome.", labels=("outcome",),
+))
+stopped_total = registry.register(metrics.Counter(
+    "pdfpeel_stopped_total",
+    "/extract requests that ended early: client gone or a budget ran out.",
+    labels=("reason",),
+))
+for _name, _help, _read in [
+    ("pdfpeel_pool_running", "Extractions running.", lambda: pool.stats()["running"]),
+    ("pdfpeel_pool_queued", "Extractions waiting for a slot.", lambda: pool.stats()["queued"]),
+    ("pdfpeel_cache_bytes", "Bytes held by the result cache.", lambda: cache.stats()["bytes"]),
+    ("pdfpeel_cache_entries", "Results held by the result cache.", lambda: cache.stats()["entries"]),
+]:
+    registry.register(metrics.Gauge(_name, _help, _read))
+
+
+class _UploadLimit:
+    """Refuses request bodies over the upload limit without reading the rest.
+
+    Starlette parses the whole form before a route runs, so the limit sits
+    in front of it: a Content-Length over the limit is refused outright,
+    and a body without one is cut off once the bytes received pass it.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] == "/extract/batch":
+            max_bytes = BATCH_MAX_BYTES
+            detail = f"Batch exceeds {max_bytes / (1024 * 1024):g} MB in total."
+        else:
+            max_bytes = MAX_UPLOAD_BYTES
+            detail = f"Upload exceeds {max_bytes / (1024 * 1024):g} MB."
+        limit = max_bytes + _FORM_OVERHEAD
+        length = Headers(scope=scope).get("content-length", "")
+        if length.isdigit() and int(length) > limit:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
 app = FastAPI()
+app.add_middleware(_UploadLimit)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 HTML_FORM = """
@@ -63,7 +253,9 @@ HTML_FORM = """
                        text-transform: uppercase; letter-spacing: 0.05em; }
     .mode-group label { display: flex; align-items: center; gap: 0.5rem;
                         font-size: 0.9rem; color: #333; padding: 0.4rem 0; cursor: pointer; }
-    .mode-group input[type="radio"] { display: inline; accent-color: #111; }
+    .mode-group input[type="radio"], .mode-group input[type="checkbox"] { display: inline; accent-color: #111; }
+    .mode-group input[type="text"] { flex: 1; font: inherit; padding: 0.3rem 0.5rem;
+                                     border: 1px solid #ccc; border-radius: 6px; }
     .hint { font-size: 0.75rem; color: #999; margin-left: 1.375rem; }
     button { background: #111; color: #fff; border: none; border-radius: 8px;
              padding: 0.75rem 2rem; font-size: 1rem; cursor: pointer; width: 100%; }
@@ -100,6 +292,23 @@ HTML_FORM = """
         <label><input type="radio" name="mode" value="layers"> Separate layers</label>
         <div class="hint">Vector-only and text-only PNGs at matching dimensions</div>
       </div>
+      <div class="mode-group">
+        <span>Options</span>
+        <label><input type="checkbox" name="dedup" value="true"> Skip repeats</label>
+        <div class="hint">Save repeated logos and headers once, with a manifest.json</div>
+      </div>
+      <div class="mode-group">
+        <span>Rendered format</span>
+        <label><input type="radio" name="format" value="png" checked> PNG</label>
+        <label><input type="radio" name="format" value="jpeg"> JPEG</label>
+        <div class="hint">JPEG is much smaller for photos and shaded artwork</div>
+      </div>
+      <div class="mode-group">
+        <span>Include</span>
+        <label><input type="checkbox" name="kinds" value="images" checked> Embedded images</label>
+        <label><input type="checkbox" name="kinds" value="vectors" checked> Vector graphics</label>
+        <label>Pages <input type="text" name="pages" placeholder="all, or e.g. 1-3,7"></label>
+      </div>
       <button type="submit">Extract</button>
     </form>
     <p style="margin-top: 1rem; font-size: 0.78rem; color: #333; display: inline-flex; align-items: center; gap: 4px;">
@@ -118,7 +327,7 @@ HTML_FORM = """
       <h2 style="font-size:1.1rem; margin-bottom:1rem;">How your data is handled</h2>
       <ul style="text-align:left; font-size:0.85rem; color:#444; line-height:1.6; padding-left:1.2rem;">
         <li>Your PDF is processed <strong>in server memory only</strong> and never written to disk.</li>
-        <li>No files or data are retained after processing completes.</li>
+        <li>{retention_note}</li>
         <li>The server runs within the <strong>European Union</strong>.</li>
       </ul>
     </div>
@@ -152,7 +361,25 @@ async def index():
         tag = f'<script defer src="https://{UMAMI_HOST}/script.js" data-website-id="{UMAMI_WEBSITE_ID}"></script>'
     else:
         tag = ""
-    return HTML_FORM.replace("{analytics_tag}", tag)
+    kept = [
+        f"Background job results are kept in server memory for {_minutes(job_manager.ttl)} "
+        f"after the job finishes (up to {_minutes(job_manager.max_ttl)} if the job asks "
+        "for longer), or until deleted.",
+        "Documents opened for inspection are kept in server memory for "
+        f"{_minutes(documents.ttl)} after their last use.",
+    ]
+    if cache.enabled:
+        kept.insert(0, (
+            f"Extraction results are kept in server memory for up to {_minutes(cache.ttl)} "
+            "so repeat uploads are instant."
+        ))
+    retention = " ".join(kept) + " All of these are then discarded; nothing else is retained."
+    return HTML_FORM.replace("{analytics_tag}", tag).replace("{retention_note}", retention)
+
+
+def _minutes(seconds: float) -> str:
+    minutes = max(1, round(seconds / 60))
+    return f"{minutes} minute{'s' if minutes != 1 else ''}"
 
 
 @app.get("/sitemap.xml")
@@ -177,31 +404,588 @@ async def robots():
     )
 
 
+@app.get("/stats")
+async def stats():
+    return {"pool": pool.stats(), "cache": cache.stats(), "jobs": job_manager.stats(),
+            "documents": documents.stats()}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+class _StageTotals(ExtractHooks):
+    """Sums hook events for one request, keeping each stage's wall-clock span."""
+
+    def __init__(self) -> None:
+        # stage -> [seconds, calls, first start, last end] (epoch seconds)
+        self.stages: dict[str, list[float]] = {}
+        self.counts: dict[str, int] = {}
+
+    def stage(self, name: str, seconds: float) -> None:
+        end = time.time()
+        totals = self.stages.get(name)
+        if totals is None:
+            self.stages[name] = [seconds, 1, end - seconds, end]
+        else:
+            totals[0] += seconds
+            totals[1] += 1
+            totals[3] = end
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def summary(self) -> dict:
+        return {"stages": self.stages, "counts": self.counts}
+
+
+def _budget(requested: int | None, cap: int | None) -> int | None:
+    if requested is None or requested <= 0:
+        return cap
+    return requested if cap is None else min(requested, cap)
+
+
+async def _extraction_options(
+    mode: str = Form("combined"),
+    dedup: bool = Form(False),
+    kinds: list[str] = Form(["images", "vectors"]),
+    render_format: str = Form("png", alias="format"),
+    quality: int = Form(85),
+    png_level: int | None = Form(None),
+    alpha: bool = Form(False),
+    max_pixels: int | None = Form(None),
+    doc_pixels: int | None = Form(None),
+) -> dict:
+    """Extraction options shared by /extract and /jobs, validated up front.
+
+    *kinds* may be repeated fields or ``"images,vectors"``; both apply
+    when the field is absent, and an empty selection is rejected.
+    """
+    options = {
+        "layers": mode == "layers",
+        "dedup": dedup,
+        "kinds": frozenset(k.strip() for v in kinds for k in v.split(",") if k.strip()),
+        "render_format": render_format,
+        "quality": quality,
+        "png_level": png_level,
+        "alpha": alpha,
+        "max_pixels": _budget(max_pixels, MAX_CLIP_PIXELS),
+        "doc_pixels": _budget(doc_pixels, MAX_DOC_PIXELS),
+    }
+    try:
+        check_options(**options)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return options
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """Read an uploaded PDF into memory, raising 413 if it's over the limit.
+
+    The form's in-memory copy is released right away so the PDF isn't held
+    twice while it's being extracted.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB.",
+        )
+    data = await file.read()
+    await file.close()
+    return data
+
+
+def _open_document(pdf_bytes: bytes, pages: str, max_pixels: int | None = None):
+    """Open *pdf_bytes*, parse the *pages* spec and run the pre-checks.
+
+    Returns ``(doc, selected pages or None)``. Raises ValueError for files
+    that aren't PDFs or bad page specs, and DocumentTooLarge.
+    """
+    try:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    except fitz.FileDataError:
+        raise ValueError("Could not open the file as a PDF.") from None
+    try:
+        selected = parse_pages(pages, len(doc)) if pages.strip() else None
+        if PRECHECK:
+            precheck(doc, pages=selected, dpi=DPI, max_pixels=max_pixels, **PRECHECKS)
+    except BaseException:
+        doc.close()
+        raise
+    return doc, selected
+
+
+def _request_budget(started: float | None, cancel=None) -> Budget:
+    return Budget(seconds=TIME_BUDGET, pages=PAGE_BUDGET, cancel=cancel, started=started)
+
+
+def _timed(hooks: ExtractHooks, stage: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Yield *chunks*, reporting the time spent producing them as *stage*.
+
+    Time suspended at a ``yield`` (the consumer sending the chunk) is not
+    counted.
+    """
+    seconds = 0.0
+    resumed = time.perf_counter()
+    for chunk in chunks:
+        seconds += time.perf_counter() - resumed
+        yield chunk
+        resumed = time.perf_counter()
+    seconds += time.perf_counter() - resumed
+    hooks.stage(stage, seconds)
+
+
+def _zip_chunks(
+    pdf_bytes: bytes,
+    pages: str,
+    options: dict,
+    instrument: bool = False,
+    started: float | None = None,
+    cancel=None,
+):
+    """Open the PDF and yield ZIP archive bytes as each entry is extracted.
+
+    *pages* is a page spec (empty for all pages), checked against the
+    document before anything is yielded. The request budgets count from
+    *started* (``time.monotonic()``), and *cancel* stops extraction once
+    set. After the archive bytes, a final summary dict is yielded: the
+    run's stage timings and counts with *instrument*, and ``stopped`` if
+    a budget cut the result short.
+    """
+    hooks = _StageTotals() if instrument else None
+    start = time.perf_counter()
+    doc, selected = _open_document(pdf_bytes, pages, options["max_pixels"])
+    if hooks is not None:
+        hooks.stage("open", time.perf_counter() - start)
+    budget = _request_budget(started, cancel)
+    try:
+        items = iter_extract(
+            doc, dpi=DPI, pages=selected, hooks=hooks, budget=budget,
+            partial=BUDGET_MODE == "partial", **options,
+        )
+        if hooks is None:
+            yield from stream_zip(items)
+        else:
+            # compression runs between items, so time it per entry
+            writer = ZipWriter()
+            for name, data in items:
+                yield from _timed(hooks, "zip", writer.add(name, data))
+            yield from _timed(hooks, "zip", writer.finish())
+    finally:
+        doc.close()
+    summary = {}
+    if hooks is not None:
+        hooks.stage("total", time.perf_counter() - start)
+        summary = hooks.summary()
+    if budget.stopped is not None:
+        summary["stopped"] = budget.stopped.reason
+    yield summary
+
+
+def _record(summary: dict, output_bytes: int) -> None:
+    """Feed one request's summary into the histograms and the Sentry transaction."""
+    stages, counts = summary["stages"], summary["counts"]
+    for name, (seconds, *_) in stages.items():
+        stage_seconds.observe(seconds, stage=name)
+    pages_per_request.observe(counts.get("pages", 0))
+    clusters_per_request.observe(counts.get("clusters", 0))
+    pixels_per_request.observe(counts.get("pixels", 0))
+    bytes_per_request.observe(output_bytes)
+
+    parent = sentry_sdk.get_current_span()
+    if parent is None:
+        return
+    for name, (seconds, calls, first, last) in stages.items():
+        span = parent.start_child(
+            op=f"pdfpeel.{name}",
+            name=name,
+            start_timestamp=datetime.fromtimestamp(first, timezone.utc),
+        )
+        span.set_data("seconds", seconds)
+        span.set_data("calls", int(calls))
+        span.finish(end_timestamp=datetime.fromtimestamp(last, timezone.utc))
+    for name, value in counts.items():
+        parent.set_data(f"pdfpeel.{name}", value)
+
+
+async def _finish_stream(chunks, key: str | None):
+    """Pass archive bytes through, then act on the trailing summary.
+
+    Records the run's metrics if it has them, and caches the whole archive
+    under *key* unless a budget cut it short.
+    """
+    parts: list[bytes] | None = [] if key else None
+    size = 0
+    summary: dict = {}
+    try:
+        async for chunk in chunks:
+            if isinstance(chunk, dict):
+                summary = chunk
+                continue
+            size += len(chunk)
+            if parts is not None:
+                if size > cache.max_bytes:
+                    parts = None  # too big to cache; stop collecting
+                else:
+                    parts.append(chunk)
+            yield chunk
+    except ExtractionStopped as exc:  # budget ran out in "fail" mode
+        stopped_total.inc(reason=exc.reason)
+        raise
+    except (asyncio.CancelledError, GeneratorExit):  # client went away
+        stopped_total.inc(reason="disconnected")
+        raise
+    if "stages" in summary:
+        _record(summary, size)
+    if "stopped" in summary:
+        stopped_total.inc(reason=summary["stopped"])
+    elif parts is not None:
+        cache.put(key, b"".join(parts))
+
+
+def _over_budget(exc: ExtractionStopped) -> JSONResponse:
+    """Response for a request stopped by a budget before anything was sent."""
+    if exc.reason == STOP_PAGES:
+        return JSONResponse(
+            {"detail": f"Document has more pages than the page budget of {PAGE_BUDGET}."},
+            status_code=413,
+        )
+    # a time budget: the document may well finish when the server is less busy
+    return JSONResponse(
+        {"detail": f"Extraction ran over the time budget of {TIME_BUDGET:g} s ({exc})."},
+        status_code=503,
+        headers={"Retry-After": RETRY_AFTER},
+    )
+
+
+async def _single_chunk(data: bytes):
+    yield data
+
+
 @app.post("/extract")
 async def extract(
+    request: Request,
     file: UploadFile = File(...),
-    mode: str = Form("combined"),
+    pages: str = Form(""),
+    options: dict = Depends(_extraction_options),
 ):
-    pdf_bytes = await file.read()
+    started = time.monotonic()
+    start = time.perf_counter()
+    pdf_bytes = await _read_upload(file)
+    if METRICS:
+        stage_seconds.observe(time.perf_counter() - start, stage="upload")
 
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    images = extract_all(doc, layers=(mode == "layers"))
-    doc.close()
+    key = None
+    if cache.enabled:
+        key = cache_key(
+            pdf_bytes, dpi=DPI, pages=pages.replace(" ", ""),
+            **{**options, "kinds": sorted(options["kinds"])},
+        )
+    cached = cache.get(key) if key else None
+    if cached is not None:
+        requests_total.inc(outcome="cached")
+        chunks = _single_chunk(cached)
+    else:
+        try:
+            chunks = await pool.stream(
+                _zip_chunks, pdf_bytes, pages, options, METRICS, started,
+                stop_kwarg="cancel", disconnected=request.is_disconnected,
+            )
+        except Abandoned:  # client left before the first bytes were ready
+            requests_total.inc(outcome="disconnected")
+            stopped_total.inc(reason="disconnected")
+            return Response(status_code=499)
+        except ExtractionStopped as exc:  # "fail" mode, before any output
+            requests_total.inc(outcome="over_budget")
+            stopped_total.inc(reason=exc.reason)
+            return _over_budget(exc)
+        except DocumentTooLarge as exc:
+            requests_total.inc(outcome="rejected")
+            return JSONResponse({"detail": f"Document is too large: {exc}."}, status_code=413)
+        except ValueError as exc:  # bad page range for this document
+            requests_total.inc(outcome="invalid")
+            return JSONResponse({"detail": str(exc)}, status_code=400)
+        except PoolFull:
+            requests_total.inc(outcome="busy")
+            return JSONResponse(
+                {"detail": "Server is busy, please try again shortly."},
+                status_code=503,
+                headers={"Retry-After": RETRY_AFTER},
+            )
+        requests_total.inc(outcome="extracted")
+        chunks = _finish_stream(chunks, key)
 
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for name, data in images:
-            zf.writestr(name, data)
-    buf.seek(0)
+    return StreamingResponse(
+        chunks, media_type="application/zip", headers=_zip_headers(file.filename),
+    )
 
-    stem = Path(file.filename).stem if file.filename else "images"
+
+def _zip_headers(filename: str | None) -> dict[str, str]:
+    stem = Path(filename).stem if filename else "images"
     zipname = f"{stem}_images.zip"
     ascii_name = zipname.encode("ascii", errors="replace").decode("ascii")
     utf8_name = quote(zipname)
+    return {
+        "Content-Disposition": f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{utf8_name}"
+    }
+
+
+def _job_info(job) -> dict:
+    info = job.info()
+    info["status_url"] = f"/jobs/{job.id}"
+    if job.status == DONE:
+        info["result_url"] = f"/jobs/{job.id}/result"
+    return info
+
+
+def _get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    pages: str = Form(""),
+    ttl: float | None = Form(None),
+    options: dict = Depends(_extraction_options),
+):
+    pdf_bytes = await _read_upload(file)
+    try:
+        job = job_manager.submit(
+            pdf_bytes,
+            filename=file.filename or "document.pdf",
+            pages=pages.strip() or None,
+            ttl=ttl,
+            **options,
+        )
+    except TooManyJobs:
+        return JSONResponse(
+            {"detail": "Too many jobs in progress, please try again shortly."},
+            status_code=503,
+            headers={"Retry-After": RETRY_AFTER},
+        )
+    return _job_info(job)
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return _job_info(_get_job(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = _get_job(job_id)
+    if job.status != DONE:
+        return JSONResponse(
+            {"detail": f"Job is {job.status}, no result available.", **_job_info(job)},
+            status_code=409,
+        )
+    return Response(job.result, media_type="application/zip", headers=_zip_headers(job.filename))
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return _job_info(job)
+
+
+def _open_and_inspect(pdf_bytes: bytes, pages: str) -> CachedDocument:
+    doc, selected = _open_document(pdf_bytes, pages, MAX_CLIP_PIXELS)
+    return CachedDocument(doc, len(pdf_bytes), inspect(doc, pages=selected))
+
+
+@app.post("/inspect")
+async def inspect_pdf(file: UploadFile = File(...), pages: str = Form("")):
+    """List a PDF's images and vector regions without rendering anything.
+
+    The returned ``doc`` id can be passed to ``/render`` for the next
+    ``PDFPEEL_INSPECT_TTL`` seconds (renewed on each use).
+    """
+    pdf_bytes = await _read_upload(file)
+    try:
+        entry = await pool.run_local(_open_and_inspect, pdf_bytes, pages)
+    except DocumentTooLarge as exc:
+        return JSONResponse({"detail": f"Document is too large: {exc}."}, status_code=413)
+    except ValueError as exc:
+        return JSONResponse({"detail": str(exc)}, status_code=400)
+    except PoolFull:
+        return JSONResponse(
+            {"detail": "Server is busy, please try again shortly."},
+            status_code=503,
+            headers={"Retry-After": RETRY_AFTER},
+        )
+    documents.put(entry)
+    return {"doc": entry.id, "expires_in": documents.ttl, **entry.manifest}
+
+
+class RenderRequest(BaseModel):
+    doc: str
+    items: list[str]
+    dpi: int = DPI
+
+
+_MEDIA_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "jpx": "image/jpx"}
+
+
+def _render_items(entry: CachedDocument, names: list[str], dpi: int) -> list[tuple[str, bytes]]:
+    with entry.lock:
+        return render_items(
+            entry.doc, entry.manifest, names, dpi=dpi, max_pixels=MAX_CLIP_PIXELS,
+        )
+
+
+async def _render(doc_id: str, names: list[str], dpi: int):
+    """Render *names* from a cached document, or return an error response."""
+    if not 36 <= dpi <= MAX_RENDER_DPI:
+        return JSONResponse(
+            {"detail": f"dpi must be between 36 and {MAX_RENDER_DPI}"}, status_code=400,
+        )
+    entry = documents.get(doc_id)
+    if entry is None:
+        return JSONResponse(
+            {"detail": "Unknown or expired document, inspect it again."}, status_code=404,
+        )
+    try:
+        return await pool.run_local(_render_items, entry, names, dpi)
+    except KeyError as exc:
+        return JSONResponse({"detail": f"No such item: {exc.args[0]}"}, status_code=404)
+    except PoolFull:
+        return JSONResponse(
+            {"detail": "Server is busy, please try again shortly."},
+            status_code=503,
+            headers={"Retry-After": RETRY_AFTER},
+        )
+
+
+@app.get("/render/{doc_id}/{name}")
+async def render_one(doc_id: str, name: str, dpi: int = DPI):
+    """Render one item listed by ``/inspect``, returned as the file itself."""
+    result = await _render(doc_id, [name], dpi)
+    if isinstance(result, Response):
+        return result
+    ext = name.rsplit(".", 1)[-1]
+    return Response(result[0][1], media_type=_MEDIA_TYPES.get(ext, "application/octet-stream"))
+
+
+@app.post("/render")
+async def render_many(request: RenderRequest):
+    """Render the chosen items listed by ``/inspect`` into one ZIP."""
+    if not request.items:
+        return JSONResponse({"detail": "No items selected."}, status_code=400)
+    result = await _render(request.doc, list(dict.fromkeys(request.items)), request.dpi)
+    if isinstance(result, Response):
+        return result
+    return StreamingResponse(
+        stream_zip(iter(result)), media_type="application/zip", headers=_zip_headers(None),
+    )
+
+
+def _extract_items(pdf_bytes: bytes, pages: str, options: dict, cancel=None):
+    """Open the PDF and yield its extracted ``(name, data)`` items.
+
+    The request budgets apply from here, per document.
+    """
+    doc, selected = _open_document(pdf_bytes, pages, options["max_pixels"])
+    try:
+        yield from iter_extract(
+            doc, dpi=DPI, pages=selected, budget=_request_budget(None, cancel),
+            partial=BUDGET_MODE == "partial", **options,
+        )
+    finally:
+        doc.close()
+
+
+def _folder_names(filenames: list[str | None]) -> list[str]:
+    """One unique, path-free folder name per uploaded file."""
+    names: list[str] = []
+    seen: set[str] = set()
+    for i, filename in enumerate(filenames, 1):
+        stem = Path((filename or "").replace("\\", "/")).stem.strip(". ") or f"file{i}"
+        name, n = stem, 2
+        while name in seen:
+            name, n = f"{stem}_{n}", n + 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+async def _batch_chunks(uploads: list[tuple[str, bytes]], pages: str, options: dict):
+    """Extract every upload and yield one ZIP with a folder per upload.
+
+    At most ``BATCH_MAX_JOBS`` documents run at once; they wait in the
+    pool's queue for a slot rather than being turned away. Items are
+    written in the order they are produced, so entries from different
+    folders interleave. A document that fails gets a
+    ``<folder>/error.txt`` entry instead of (or after) its items.
+    """
+    writer = ZipWriter()
+    entries: asyncio.Queue = asyncio.Queue(maxsize=16)
+    limit = asyncio.Semaphore(BATCH_MAX_JOBS)
+
+    async def produce(folder: str, pdf_bytes: bytes) -> None:
+        async with limit:
+            try:
+                items = await pool.stream(
+                    _extract_items, pdf_bytes, pages, options, stop_kwarg="cancel", wait=True,
+                )
+                async for name, data in items:
+                    await entries.put((f"{folder}/{name}", data))
+            except Exception as exc:
+                message = f"{type(exc).__name__}: {exc}\n".encode()
+                await entries.put((f"{folder}/error.txt", message))
+
+    async def produce_all() -> None:
+        await asyncio.gather(*(produce(folder, data) for folder, data in uploads))
+        await entries.put(None)
+
+    producer = asyncio.create_task(produce_all())
+    try:
+        while (entry := await entries.get()) is not None:
+            for chunk in writer.add(*entry):
+                yield chunk
+        for chunk in writer.finish():
+            yield chunk
+    finally:
+        producer.cancel()
+
+
+@app.post("/extract/batch")
+async def extract_batch(
+    files: list[UploadFile] = File(...),
+    pages: str = Form(""),
+    options: dict = Depends(_extraction_options),
+):
+    """Extract several PDFs into one ZIP, one folder per file."""
+    if len(files) > BATCH_MAX_FILES:
+        return JSONResponse(
+            {"detail": f"At most {BATCH_MAX_FILES} files per batch."}, status_code=413,
+        )
+    if pool.full:
+        return JSONResponse(
+            {"detail": "Server is busy, please try again shortly."},
+            status_code=503,
+            headers={"Retry-After": RETRY_AFTER},
+        )
+    contents: list[bytes] = []
+    total = 0
+    for upload in files:
+        data = await upload.read()
+        await upload.close()
+        total += len(data)
+        if total > BATCH_MAX_BYTES:
+            return JSONResponse(
+                {"detail": f"Batch exceeds {BATCH_MAX_BYTES / (1024 * 1024):g} MB in total."},
+                status_code=413,
+            )
+        contents.append(data)
+    uploads = list(zip(_folder_names([f.filename for f in files]), contents))
     return StreamingResponse(
-        buf,
+        _batch_chunks(uploads, pages, options),
         media_type="application/zip",
-        headers={
-            "Content-Disposition": f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{utf8_name}"
-        },
+        headers=_zip_headers("batch"),
     )
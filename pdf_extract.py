@@ -8,117 +8,332 @@ Supports extracting:
 
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from array import array
+from math import floor
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, wait as futures_wait
+from contextlib import nullcontext
+from itertools import islice
+
 import fitz
 
 
 # ---------------------------------------------------------------------------
-# PDF content-stream tokenizer & layer filters
+# Instrumentation hooks
 # ---------------------------------------------------------------------------
 
-def _tokenize(stream: bytes):
-    """Yield (raw_bytes, token_type) from a PDF content stream.
+class ExtractHooks:
+    """Receives measurements from the extraction pipeline.
 
-    token_type is one of: "ws", "string", "hexstring", "token".
-    Every byte of the input is accounted for in the output so that
-    b"".join(raw for raw, _ in _tokenize(stream)) == stream.
+    Pass an instance as ``hooks=`` to :func:`iter_extract` or
+    :func:`extract_all` and override what you need. :meth:`stage` is called
+    with the wall-clock seconds of each pipeline step as it finishes:
+    ``images`` per embedded image pulled out of the file, ``scan``,
+    ``cluster`` and ``strip`` once per page, ``render`` and ``encode`` once
+    per rendered image. :meth:`count` reports ``pages``,
+    ``clusters``, rendered ``pixels``, output ``items`` and output ``bytes``.
+
+    With no hooks (the default) the pipeline does no timing at all.
     """
-    i = 0
-    n = len(stream)
-    WS = b" \n\r\t\x00\x0c"
-    DELIMS = b"()<>[]{}/%"
-
-    while i < n:
-        c = stream[i : i + 1]
-
-        # --- whitespace run ---
-        if c[0] in WS:
-            start = i
-            while i < n and stream[i : i + 1][0] in WS:
-                i += 1
-            yield stream[start:i], "ws"
-            continue
 
-        # --- string literal (...) ---
-        if c == b"(":
-            start = i
-            depth = 1
-            i += 1
-            while i < n and depth > 0:
-                ch = stream[i : i + 1]
-                if ch == b"\\":
-                    i += 2
-                    continue
-                if ch == b"(":
-                    depth += 1
-                elif ch == b")":
-                    depth -= 1
-                i += 1
-            yield stream[start:i], "string"
-            continue
+    def stage(self, name: str, seconds: float) -> None:
+        pass
 
-        # --- hex string <...> (not dict <<) ---
-        if c == b"<" and stream[i + 1 : i + 2] != b"<":
-            start = i
-            i = stream.index(b">", i) + 1
-            yield stream[start:i], "hexstring"
-            continue
+    def count(self, name: str, value: int) -> None:
+        pass
 
-        # --- comment %... ---
-        if c == b"%":
-            start = i
-            while i < n and stream[i : i + 1] not in (b"\n", b"\r"):
-                i += 1
-            yield stream[start:i], "ws"  # treat comments as whitespace
-            continue
 
-        # --- everything else: operator / operand token ---
-        # includes numbers, names (/Foo), booleans, dict delims, arrays, operators
-        start = i
-        if c == b"/" or c == b"[" or c == b"]":
-            # name or array delimiters — scan until next delimiter/ws
-            i += 1
-            if c == b"/":
-                while i < n and stream[i : i + 1][0] not in WS and stream[i : i + 1][0] not in DELIMS:
-                    i += 1
-        elif stream[i : i + 2] in (b"<<", b">>"):
-            i += 2
+class _Recorder(ExtractHooks):
+    """Hooks that store events so a worker process can hand them back."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, str, float]] = []
+
+    def stage(self, name: str, seconds: float) -> None:
+        self.events.append(("stage", name, seconds))
+
+    def count(self, name: str, value: int) -> None:
+        self.events.append(("count", name, value))
+
+    @staticmethod
+    def replay(events: list[tuple[str, str, float]], hooks: ExtractHooks) -> None:
+        for kind, name, value in events:
+            if kind == "stage":
+                hooks.stage(name, value)
+            else:
+                hooks.count(name, value)
+
+
+class _StageTimer:
+    __slots__ = ("hooks", "name", "start")
+
+    def __init__(self, hooks: ExtractHooks, name: str) -> None:
+        self.hooks = hooks
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.hooks.stage(self.name, time.perf_counter() - self.start)
+
+
+_NO_TIMER = nullcontext()
+
+
+def _stage(hooks: ExtractHooks | None, name: str):
+    """Context manager timing stage *name* into *hooks*; a no-op without hooks."""
+    return _NO_TIMER if hooks is None else _StageTimer(hooks, name)
+
+
+# ---------------------------------------------------------------------------
+# Cancellation & budgets
+# ---------------------------------------------------------------------------
+
+STOP_CANCELLED = "cancelled"
+STOP_TIME = "time_budget"
+STOP_PAGES = "page_budget"
+
+# Written as the last item of a partial result (see ``partial=``).
+INCOMPLETE_NAME = "incomplete.json"
+# Lists the regions a document pixel budget left out (see ``doc_pixels=``).
+SKIPPED_NAME = "skipped.json"
+
+
+class ExtractionStopped(Exception):
+    """Raised when extraction stops before finishing.
+
+    *reason* is one of ``STOP_CANCELLED``, ``STOP_TIME`` or ``STOP_PAGES``;
+    *page* is the 1-based page that was not (fully) extracted.
+    """
+
+    def __init__(self, reason: str, page: int | None = None) -> None:
+        super().__init__(reason, page)
+        self.reason = reason
+        self.page = page
+
+    def __str__(self) -> str:
+        what = {
+            STOP_CANCELLED: "extraction cancelled",
+            STOP_TIME: "time budget exceeded",
+            STOP_PAGES: "page budget exceeded",
+        }.get(self.reason, self.reason)
+        return what if self.page is None else f"{what} at page {self.page}"
+
+
+class Budget:
+    """Limits for one extraction, checked before every page and vector cluster.
+
+    *seconds* is a wall-clock limit counted from *started* (a
+    :func:`time.monotonic` value, default now). *pages* caps how many of the
+    selected pages are processed. *cancel* is anything with an ``is_set()``
+    method, such as a :class:`threading.Event`; once set, extraction stops
+    at the next check.
+
+    After a partial extraction, :attr:`stopped` holds the reason it ended.
+    """
+
+    def __init__(
+        self,
+        *,
+        seconds: float | None = None,
+        pages: int | None = None,
+        cancel=None,
+        started: float | None = None,
+    ) -> None:
+        if seconds is not None and seconds <= 0:
+            raise ValueError("seconds must be > 0")
+        if pages is not None and pages < 1:
+            raise ValueError("pages must be >= 1")
+        if seconds is None:
+            self.deadline = None
         else:
+            self.deadline = (time.monotonic() if started is None else started) + seconds
+        self.pages = pages
+        self.cancel = cancel
+        self.stopped: ExtractionStopped | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel is not None and self.cancel.is_set()
+
+    def check(self, page: int | None = None) -> None:
+        """Raise :class:`ExtractionStopped` if cancelled or out of time."""
+        if self.cancelled:
+            raise ExtractionStopped(STOP_CANCELLED, page)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise ExtractionStopped(STOP_TIME, page)
+
+    def _for_worker(self) -> Budget | None:
+        # worker processes only get the deadline: the cancel flag can't be
+        # pickled (the parent polls it instead) and pages are cut up front
+        if self.deadline is None:
+            return None
+        budget = Budget()
+        budget.deadline = self.deadline
+        return budget
+
+
+def _incomplete(stopped: ExtractionStopped, pages_requested: int) -> bytes:
+    return json.dumps({
+        "complete": False,
+        "reason": stopped.reason,
+        "stopped_at_page": stopped.page,
+        "pages_requested": pages_requested,
+        "detail": str(stopped),
+    }, indent=2).encode()
+
+
+# ---------------------------------------------------------------------------
+# PDF content-stream tokenizer & layer filters
+# ---------------------------------------------------------------------------
+
+# Character-class bodies for the regexes below.
+_WS = rb" \n\r\t\x00\x0c"
+_DELIMS = rb"()<>\[\]{}/%"
+
+# Pattern fragments for the token grammar, shared by _TOKEN_RE, _LAYER_RE
+# and _PATH_SCAN_RE.  String literals without nested parens (the common
+# case) match _STRING; any other "(" matches "open" in each regex and its
+# body is scanned by _string_end.  A "<" that starts neither "<<" nor a
+# terminated hex string matches nothing (see _scan_tokens).
+_WS_RUN = rb"[" + _WS + rb"]+|%[^\r\n]*"  # comments count as whitespace
+_DICT_DELIM = rb"<<|>>"
+_KEYWORD = rb"[^" + _WS + rb"%(</\[\]][^" + _WS + _DELIMS + rb"]*"  # operators, numbers
+_NAME = rb"/[^" + _WS + _DELIMS + rb"]*"
+_ARRAY_DELIM = rb"[\[\]]"
+_STRING = rb"\([^\\()]*(?:\\.[^\\()]*)*\)"
+_HEX_STRING = rb"<(?!<)[^>]*>"
+_TOKEN_END = rb"(?=[" + _WS + _DELIMS + rb"]|\Z)"
+
+# One alternative per token kind, most frequent first.
+_TOKEN_RE = re.compile(
+    rb"(?P<ws>" + _WS_RUN + rb")"
+    rb"|(?P<token>" + _DICT_DELIM + rb"|" + _KEYWORD + rb"|" + _NAME + rb"|" + _ARRAY_DELIM + rb")"
+    rb"|(?P<string>" + _STRING + rb")"
+    rb"|(?P<open>\()"
+    rb"|(?P<hexstring>" + _HEX_STRING + rb")",
+    re.DOTALL,
+)
+_STRING_SPECIAL_RE = re.compile(rb"[\\()]")
+
+
+def _string_end(stream: bytes, i: int) -> int:
+    """Return the end offset of the string literal whose "(" is at *i*."""
+    n = len(stream)
+    depth = 1
+    i += 1
+    while depth:
+        m = _STRING_SPECIAL_RE.search(stream, i)
+        if m is None:
+            return n
+        i = m.end()
+        ch = stream[m.start()]
+        if ch == 0x5C:  # backslash: skip the escaped byte
             i += 1
-            while i < n and stream[i : i + 1][0] not in WS and stream[i : i + 1][0] not in DELIMS:
-                i += 1
+            if i >= n:
+                return n
+        elif ch == 0x28:
+            depth += 1
+        else:
+            depth -= 1
+    return i
 
-        yield stream[start:i], "token"
+
+def _scan_tokens(token_re: re.Pattern, stream: bytes):
+    """Yield ``(kind, start, end)`` for consecutive matches of *token_re* over *stream*.
+
+    *token_re* is one of the regexes built from the fragments above; *kind*
+    is the name of the group that matched. String literals that need
+    _string_end are reported as "string". Raises ValueError at a "<" that
+    *token_re* can't match.
+    """
+    n = len(stream)
+    pos = 0
+    while pos < n:
+        for m in token_re.finditer(stream, pos):
+            kind = m.lastgroup
+            if m.start() != pos or kind == "open":
+                break
+            pos = m.end()
+            yield kind, m.start(), pos
+        else:
+            if pos < n:
+                raise ValueError(f"unterminated hex string at offset {pos}")
+            return
+        if m.start() != pos:
+            # finditer skipped an unmatched "<"
+            raise ValueError(f"unterminated hex string at offset {pos}")
+        # nested or unterminated string literal; resume matching after it
+        end = _string_end(stream, pos)
+        yield "string", pos, end
+        pos = end
+
+
+def _tokenize(stream: bytes):
+    """Yield (raw_bytes, token_type) from a PDF content stream.
+
+    token_type is one of: "ws", "string", "hexstring", "token".
+    Every byte of the input is accounted for in the output so that
+    b"".join(raw for raw, _ in _tokenize(stream)) == stream.
+    Comments are reported as "ws".
+    """
+    for kind, start, end in _scan_tokens(_TOKEN_RE, stream):
+        yield stream[start:end], kind
 
 
 _PAINT_OPS = frozenset({b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*"})
 
 
-def _strip_text(stream: bytes) -> bytes:
-    """Remove BT … ET text blocks from a content stream."""
-    result = bytearray()
-    in_text = False
-    for raw, ttype in _tokenize(stream):
-        if ttype == "token":
-            if raw == b"BT":
-                in_text = True
-                continue
-            if raw == b"ET":
-                in_text = False
-                continue
-        if not in_text:
-            result.extend(raw)
-    return bytes(result)
+_LAYER_OP = rb"(?:BT|ET|f\*|B\*|b\*|[SsfFBb])" + _TOKEN_END
+# Tokenizes like _TOKEN_RE, but a whole run of tokens that _split_layers
+# leaves alone (everything but BT, ET and the paint operators) is one
+# "run" match, so the Python loop only sees the tokens it acts on.
+_LAYER_RE = re.compile(
+    rb"(?P<run>(?:" + _WS_RUN + rb"|" + _DICT_DELIM + rb"|(?!" + _LAYER_OP + rb")" + _KEYWORD
+    + rb"|" + _NAME + rb"|" + _ARRAY_DELIM + rb"|" + _STRING + rb"|" + _HEX_STRING + rb")+)"
+    rb"|(?P<op>" + _LAYER_OP + rb")"
+    rb"|(?P<open>\()",
+    re.DOTALL,
+)
 
 
-def _strip_vectors(stream: bytes) -> bytes:
-    """Neutralise path-painting operators (replace with ``n``) so vectors vanish."""
-    result = bytearray()
-    for raw, ttype in _tokenize(stream):
-        if ttype == "token" and raw in _PAINT_OPS:
-            result.extend(b"n")
+def _split_layers(stream: bytes) -> tuple[bytes, bytes]:
+    """Return *stream* without BT … ET blocks, and with paint operators turned into ``n``.
+
+    The output only differs from *stream* at BT, ET and paint operators, so
+    the bytes between them are copied in slices.
+    """
+    no_text = bytearray()
+    no_vectors = bytearray()
+    in_text = False
+    text_from = vectors_from = 0  # start of the span not yet copied
+    for kind, start, end in _scan_tokens(_LAYER_RE, stream):
+        if kind != "op":
+            continue
+        op = stream[start:end]
+        if op == b"BT" or op == b"ET":
+            if not in_text:
+                no_text += stream[text_from:start]
+            in_text = op == b"BT"
+            text_from = end
         else:
-            result.extend(raw)
-    return bytes(result)
+            no_vectors += stream[vectors_from:start]
+            no_vectors += b"n"
+            vectors_from = end
+    no_vectors += stream[vectors_from:]
+    if not in_text:
+        no_text += stream[text_from:]
+    return bytes(no_text), bytes(no_vectors)
 
 
 # ---------------------------------------------------------------------------
@@ -126,55 +341,410 @@ def _strip_vectors(stream: bytes) -> bytes:
 # ---------------------------------------------------------------------------
 
 def _cluster_rects(rects: list[fitz.Rect], gap: float = 20.0) -> list[fitz.Rect]:
-    """Merge overlapping / nearby rectangles into clusters."""
+    """Merge overlapping / nearby rectangles into clusters.
+
+    Two clusters merge when one, grown by *gap* on every side, overlaps the
+    other, until no such pair is left. Clusters are returned in the order of
+    their first rectangle in *rects*.
+
+    Rectangles are added one at a time to a uniform grid of the clusters
+    built so far, so each one is only compared with clusters in nearby cells.
+    Clusters are tracked with union-find; the root is always the member with
+    the lowest index, which gives the output order. After each rectangle is
+    added no two clusters are within *gap* of each other, so the result is
+    the same as repeatedly merging pairs until nothing changes. Expects
+    non-empty rects (as produced by ``_page_drawing_clusters``).
+    """
     if not rects:
         return []
-    clusters = [fitz.Rect(r) for r in rects]
-    merged = True
-    while merged:
-        merged = False
-        new_clusters: list[fitz.Rect] = []
-        used: set[int] = set()
-        for i, a in enumerate(clusters):
-            if i in used:
-                continue
-            expanded = fitz.Rect(a.x0 - gap, a.y0 - gap, a.x1 + gap, a.y1 + gap)
-            for j in range(i + 1, len(clusters)):
-                if j in used:
+
+    size = max(2.0 * gap, 16.0)
+    boxes: list[list[float]] = []  # per rect; authoritative for roots only
+    parent: list[int] = []
+    registered: list[tuple[int, int, int, int] | None] = []  # cell span per root
+    grid: dict[tuple[int, int], list[int]] = {}
+
+    def find(i: int) -> int:
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def span(x0: float, y0: float, x1: float, y1: float) -> tuple[int, int, int, int]:
+        return floor(x0 / size), floor(y0 / size), floor(x1 / size), floor(y1 / size)
+
+    def register(c: int) -> None:
+        """Add root *c* to every grid cell its box covers that it isn't in yet."""
+        cx0, cy0, cx1, cy1 = span(*boxes[c])
+        old = registered[c]
+        if old == (cx0, cy0, cx1, cy1):
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                if old and old[0] <= cx <= old[2] and old[1] <= cy <= old[3]:
                     continue
-                if expanded.intersects(clusters[j]):
-                    a |= clusters[j]
-                    expanded = fitz.Rect(a.x0 - gap, a.y0 - gap, a.x1 + gap, a.y1 + gap)
-                    used.add(j)
-                    merged = True
-            new_clusters.append(a)
-            used.add(i)
-        clusters = new_clusters
-    return clusters
-
-
-def _page_drawing_clusters(page: fitz.Page) -> list[fitz.Rect]:
-    """Return clustered bounding boxes of vector drawings on *page*."""
-    drawings = page.get_drawings()
-    if not drawings:
-        return []
-    rects: list[fitz.Rect] = []
-    for d in drawings:
-        r = fitz.Rect(d["rect"])
-        if r.width < 5 or r.height < 5:
+                grid.setdefault((cx, cy), []).append(c)
+        registered[c] = (cx0, cy0, cx1, cy1)
+
+    for r in rects:
+        x0, y0, x1, y1 = r
+        c = len(boxes)
+        boxes.append([x0, y0, x1, y1])
+        parent.append(c)
+        registered.append(None)
+
+        # Merge with every nearby cluster; a merge grows the box, which can
+        # bring further clusters into range, so repeat until nothing is hit.
+        while True:
+            x0, y0, x1, y1 = boxes[c]
+            ex0, ey0, ex1, ey1 = x0 - gap, y0 - gap, x1 + gap, y1 + gap
+            cx0, cy0, cx1, cy1 = span(ex0, ey0, ex1, ey1)
+            hits: set[int] = set()
+            seen: set[int] = {c}
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    for k in grid.get((cx, cy), ()):
+                        k = find(k)
+                        if k in seen:
+                            continue
+                        seen.add(k)
+                        b = boxes[k]
+                        if ex0 < b[2] and b[0] < ex1 and ey0 < b[3] and b[1] < ey1:
+                            hits.add(k)
+            if not hits:
+                break
+            members = hits | {c}
+            root = min(members)
+            # fitz unions rects in single precision; match it so merged boxes
+            # (and later comparisons against them) are exactly what
+            # ``Rect | Rect`` would give
+            merged = array("f", (
+                min(boxes[k][0] for k in members),
+                min(boxes[k][1] for k in members),
+                max(boxes[k][2] for k in members),
+                max(boxes[k][3] for k in members),
+            )).tolist()
+            # Existing clusters are pairwise settled, so if the merge didn't
+            # grow past one of them there is nothing new in range.
+            settled = any(boxes[k] == merged for k in hits)
+            for k in members:
+                parent[k] = root
+            boxes[root] = merged
+            c = root
+            if settled:
+                break
+        register(c)
+
+    return [fitz.Rect(boxes[i]) for i in range(len(boxes)) if parent[i] == i]
+
+
+# Coordinate pairs taken by each path-construction operator.
+_PATH_POINTS = {b"m": 1, b"l": 1, b"c": 3, b"v": 2, b"y": 2, b"re": 2, b"cm": 3}
+_NUMBER = rb"[-+]?(?:\d+\.?\d*|\.\d+)"
+# _TOKEN_RE plus two alternatives: "path" takes a path-construction (or cm)
+# operator together with its numeric operands in a single match, which is
+# most of a drawing-heavy stream, and "inline" takes an ID operator with the
+# binary inline image data after it, up to its EI.
+_PATH_SCAN_RE = re.compile(
+    rb"(?P<path>(?:" + _NUMBER + rb"[" + _WS + rb"]+){2,6}(?:re|cm|[mlcvy])" + _TOKEN_END + rb")"
+    rb"|(?P<inline>ID" + _TOKEN_END + rb"(?:.*?[" + _WS + rb"]EI(?=[" + _WS + rb"]|\Z)|.*))"
+    rb"|" + _TOKEN_RE.pattern,
+    re.DOTALL,
+)
+_NUMBER_START = frozenset(b"0123456789+-.")
+# Form XObjects nested deeper than this are not scanned.
+_MAX_FORM_DEPTH = 12
+
+
+def _form_matrix(doc: fitz.Document, xref: int) -> tuple[float, ...]:
+    kind, value = doc.xref_get_key(xref, "Matrix")
+    if kind != "array":
+        return (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+    matrix = tuple(float(v) for v in value.strip("[]").split())
+    if len(matrix) != 6:
+        raise ValueError(f"bad form matrix in xref {xref}")
+    return matrix
+
+
+def _resolve_xobject(
+    doc: fitz.Document, owner: int, name: str, page_xobjects: dict[str, int]
+) -> int | None:
+    """xref of the form XObject *name* used by *owner* (0: the page), else None."""
+    xref = None
+    if owner:
+        kind, value = doc.xref_get_key(owner, f"Resources/XObject/{name}")
+        if kind == "xref":
+            xref = int(value.split()[0])
+    if xref is None:
+        # the page's own resources, which forms without any also inherit
+        xref = page_xobjects.get(name)
+    if xref is None or doc.xref_get_key(xref, "Subtype")[1] != "/Form":
+        return None
+    return xref
+
+
+def _scan_path_rects(
+    doc: fitz.Document,
+    stream: bytes,
+    ctm: tuple[float, ...],
+    rects: list[fitz.Rect],
+    owner: int,
+    page_xobjects: dict[str, int],
+    depth: int = 0,
+) -> None:
+    """Append the bounding box of every painted path in *stream* to *rects*.
+
+    Tracks only what affects path geometry: ``q``/``Q``/``cm``, the
+    path-construction operators and form XObjects (``Do``). Boxes are of the
+    transformed path points, control points included, as MuPDF bounds paths
+    for ``get_drawings()``; line widths are not added.
+    """
+    a, b, c, d, e, f = ctm
+    saved: list[tuple[float, ...]] = []
+    operands: list = []
+    x0 = y0 = float("inf")
+    x1 = y1 = float("-inf")
+    for kind, start, end in _scan_tokens(_PATH_SCAN_RE, stream):
+        if kind == "ws":
+            continue
+        if kind == "path":
+            *values, tok = stream[start:end].split()
+            values = [float(v) for v in values[-2 * _PATH_POINTS[tok]:]]
+            if tok == b"cm":
+                ma, mb, mc, md, me, mf = values
+                a, b, c, d, e, f = (
+                    ma * a + mb * c, ma * b + mb * d,
+                    mc * a + md * c, mc * b + md * d,
+                    me * a + mf * c + e, me * b + mf * d + f,
+                )
+            else:
+                if tok == b"re":
+                    x, y, w, h = values
+                    values = [x, y, x + w, y, x, y + h, x + w, y + h]
+                for i in range(0, len(values), 2):
+                    x, y = values[i], values[i + 1]
+                    px = a * x + c * y + e
+                    py = b * x + d * y + f
+                    if px < x0:
+                        x0 = px
+                    if px > x1:
+                        x1 = px
+                    if py < y0:
+                        y0 = py
+                    if py > y1:
+                        y1 = py
+            operands.clear()
+            continue
+        if kind == "inline":
+            operands.clear()
+            continue
+        if kind != "token":
+            operands.append(None)
+            continue
+        tok = stream[start:end]
+        if tok[0] in _NUMBER_START:
+            operands.append(float(tok))
             continue
-        if r.width >= page.rect.width * 0.98 and r.height >= page.rect.height * 0.98:
+        if tok[0] == 0x2F:  # name
+            operands.append(tok)
             continue
-        rects.append(r)
-    return _cluster_rects(rects)
+        if tok in _PAINT_OPS or tok == b"n":
+            if tok != b"n" and x0 <= x1:
+                rects.append(fitz.Rect(x0, y0, x1, y1))
+            x0 = y0 = float("inf")
+            x1 = y1 = float("-inf")
+        elif tok == b"q":
+            saved.append((a, b, c, d, e, f))
+        elif tok == b"Q":
+            if saved:
+                a, b, c, d, e, f = saved.pop()
+        elif tok == b"Do":
+            xref = _resolve_xobject(doc, owner, operands[-1][1:].decode(), page_xobjects)
+            if xref is not None and depth < _MAX_FORM_DEPTH:
+                ma, mb, mc, md, me, mf = _form_matrix(doc, xref)
+                _scan_path_rects(
+                    doc, doc.xref_stream(xref) or b"",
+                    (
+                        ma * a + mb * c, ma * b + mb * d,
+                        mc * a + md * c, mc * b + md * d,
+                        me * a + mf * c + e, me * b + mf * d + f,
+                    ),
+                    rects, xref, page_xobjects, depth + 1,
+                )
+        operands.clear()
+
+
+def _page_path_rects(page: fitz.Page) -> list[fitz.Rect]:
+    page_xobjects = {name: xref for xref, name, invoker, _ in page.get_xobjects() if invoker == 0}
+    rects: list[fitz.Rect] = []
+    _scan_path_rects(
+        page.parent, page.read_contents(), tuple(page.transformation_matrix),
+        rects, 0, page_xobjects,
+    )
+    return rects
+
+
+def _page_drawing_rects(
+    page: fitz.Page,
+    *,
+    bbox_scan: bool = False,
+    drawings: list[dict] | None = None,
+) -> Iterator[fitz.Rect]:
+    """Yield the bounding box of every vector path painted on *page*.
+
+    By default the boxes come from ``page.get_drawings()``. With *bbox_scan*
+    they come from scanning the content stream for path geometry instead,
+    which only keeps one rectangle per painted path rather than a dict of
+    every path item, colour and width; the boxes are the same. Pages the
+    scanner can't parse fall back to ``get_drawings()``. Pass *drawings* to
+    reuse an existing ``get_drawings()`` result.
+    """
+    if bbox_scan:
+        try:
+            rects = _page_path_rects(page)
+        except (ValueError, IndexError, TypeError, RuntimeError):
+            pass
+        else:
+            yield from rects
+            return
+    for d in page.get_drawings() if drawings is None else drawings:
+        yield fitz.Rect(d["rect"])
+
+
+def _page_drawing_clusters(
+    page: fitz.Page,
+    *,
+    bbox_scan: bool = False,
+    drawings: list[dict] | None = None,
+    hooks: ExtractHooks | None = None,
+) -> list[fitz.Rect]:
+    """Return clustered bounding boxes of vector drawings on *page*."""
+    with _stage(hooks, "scan"):
+        rects: list[fitz.Rect] = []
+        for r in _page_drawing_rects(page, bbox_scan=bbox_scan, drawings=drawings):
+            if r.width < 5 or r.height < 5:
+                continue
+            if r.width >= page.rect.width * 0.98 and r.height >= page.rect.height * 0.98:
+                continue
+            rects.append(r)
+    with _stage(hooks, "cluster"):
+        return _cluster_rects(rects)
 
 
-def _render_clip(page: fitz.Page, clip: fitz.Rect, dpi: int) -> bytes:
-    """Render a clipped region of *page* as PNG bytes."""
+RENDER_FORMATS = ("png", "jpeg", "webp")
+
+# PNG colour type by (colour components, alpha)
+_PNG_COLOR_TYPES = {(1, 0): 0, (3, 0): 2, (1, 1): 4, (3, 1): 6}
+
+
+def _png_bytes(pix: fitz.Pixmap, level: int) -> bytes:
+    """Encode *pix* as PNG with zlib compression *level* (MuPDF's is fixed)."""
+    color_type = _PNG_COLOR_TYPES.get((pix.n - pix.alpha, pix.alpha))
+    if color_type is None:
+        return pix.tobytes("png")
+    width, height, stride = pix.width, pix.height, pix.stride
+    row = width * pix.n
+    samples = pix.samples_mv
+    # each scanline is prefixed with filter type 0 (None)
+    raw = bytearray((row + 1) * height)
+    for y in range(height):
+        start = y * (row + 1) + 1
+        raw[start:start + row] = samples[y * stride:y * stride + row]
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw, level)),
+        chunk(b"IEND", b""),
+    ))
+
+
+class _Encoding:
+    """How rendered regions are encoded; picklable so workers get a copy."""
+
+    __slots__ = ("format", "quality", "png_level", "alpha")
+
+    def __init__(
+        self,
+        format: str = "png",
+        quality: int = 85,
+        png_level: int | None = None,
+        alpha: bool = False,
+    ) -> None:
+        if format not in RENDER_FORMATS:
+            raise ValueError(f"unknown format {format!r}; expected one of {', '.join(RENDER_FORMATS)}")
+        if not 1 <= quality <= 100:
+            raise ValueError("quality must be between 1 and 100")
+        if png_level is not None and not 0 <= png_level <= 9:
+            raise ValueError("png_level must be between 0 and 9")
+        if alpha and format == "jpeg":
+            raise ValueError("jpeg output has no alpha channel")
+        if format == "webp" and importlib.util.find_spec("PIL") is None:
+            raise ValueError("webp output needs Pillow installed")
+        self.format = format
+        self.quality = quality
+        self.png_level = png_level
+        self.alpha = alpha
+
+    @property
+    def ext(self) -> str:
+        return "jpg" if self.format == "jpeg" else self.format
+
+    def encode(self, pix: fitz.Pixmap) -> bytes:
+        if self.format == "jpeg":
+            return pix.tobytes("jpeg", jpg_quality=self.quality)
+        if self.format == "webp":
+            return pix.pil_tobytes(format="WEBP", quality=self.quality)
+        if self.png_level is None:
+            return pix.tobytes("png")
+        return _png_bytes(pix, self.png_level)
+
+
+_PNG = _Encoding()
+
+
+def _render_clip(
+    page: fitz.Page,
+    clip: fitz.Rect,
+    dpi: float,
+    hooks: ExtractHooks | None = None,
+    encoding: _Encoding = _PNG,
+) -> bytes:
+    """Render a clipped region of *page*, encoded as *encoding* (PNG by default)."""
     zoom = dpi / 72
     mat = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat, clip=clip)
-    return pix.tobytes("png")
+    with _stage(hooks, "render"):
+        pix = page.get_pixmap(matrix=mat, clip=clip, alpha=encoding.alpha)
+    if hooks is not None:
+        hooks.count("pixels", pix.width * pix.height)
+    with _stage(hooks, "encode"):
+        return encoding.encode(pix)
+
+
+# Regions that would need less than this to fit a pixel budget are skipped
+# rather than rendered as an unreadable thumbnail.
+_MIN_BUDGET_DPI = 36
+
+
+def _clip_pixels(clip: fitz.Rect, dpi: float) -> int:
+    zoom = dpi / 72
+    return (clip * fitz.Matrix(zoom, zoom)).irect.get_area()
+
+
+def _fit_dpi(clip: fitz.Rect, dpi: float, max_pixels: int) -> float:
+    """Highest DPI up to *dpi* at which *clip* renders to at most *max_pixels*."""
+    if _clip_pixels(clip, dpi) <= max_pixels:
+        return dpi
+    # area scales with dpi squared; shave a little for pixel rounding
+    fitted = dpi * (max_pixels / max(1, _clip_pixels(clip, dpi))) ** 0.5
+    while fitted > 1 and _clip_pixels(clip, fitted) > max_pixels:
+        fitted *= 0.99
+    return fitted
 
 
 def _padded_clip(clip: fitz.Rect, page_rect: fitz.Rect, pad: float = 5.0) -> fitz.Rect:
@@ -183,31 +753,620 @@ def _padded_clip(clip: fitz.Rect, page_rect: fitz.Rect, pad: float = 5.0) -> fit
     return clip
 
 
-def _make_temp_page(doc: fitz.Document, page_num: int) -> tuple[fitz.Document, fitz.Page]:
-    """Create a temporary single-page document from *page_num*."""
+def _replace_contents(doc: fitz.Document, page: fitz.Page, stream: bytes) -> None:
+    """Make *stream* the whole content of *page* in *doc*."""
+    xrefs = page.get_contents()
+    doc.update_stream(xrefs[0], stream)
+    for xref in xrefs[1:]:
+        doc.update_stream(xref, b"")
+
+
+def _make_layer_pages(doc: fitz.Document, page_num: int) -> tuple[fitz.Document, fitz.Page, fitz.Page]:
+    """Create a temporary document with vector-only and text-only copies of *page_num*.
+
+    The page is copied and cleaned once; the second page is a full copy that
+    shares its resources, and both content streams come from a single
+    tokenizer pass. Returns ``(tmp_doc, vector_page, text_page)``.
+    """
     tmp = fitz.open()
     tmp.insert_pdf(doc, from_page=page_num, to_page=page_num)
     page = tmp[0]
     page.clean_contents()
-    return tmp, page
+    stream = b"\n".join(tmp.xref_stream(xref) for xref in page.get_contents())
+    tmp.fullcopy_page(0)
+    # page objects don't survive the page-tree change; load them afresh
+    vec_page, txt_page = tmp[0], tmp[1]
+    no_text, no_vectors = _split_layers(stream)
+    _replace_contents(tmp, vec_page, no_text)
+    _replace_contents(tmp, txt_page, no_vectors)
+    return tmp, vec_page, txt_page
+
+
+# ---------------------------------------------------------------------------
+# Page-range extraction
+# ---------------------------------------------------------------------------
+
+class _Dedup:
+    """Bookkeeping for ``dedup=True``: which outputs were already emitted.
+
+    *files* maps a content key (an image xref, or a cluster signature plus
+    layer suffix) to the file first written for it. *entries* records every
+    occurrence as ``(page_number, name, key, file)`` for the manifest.
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[tuple, str] = {}
+        self.entries: list[tuple[int, str, tuple, str]] = []
+
+    def add(self, page_no: int, name: str, key: tuple) -> None:
+        self.files.setdefault(key, name)
+        self.entries.append((page_no, name, key, name))
+
+    def alias(self, page_no: int, name: str, key: tuple) -> None:
+        self.entries.append((page_no, name, key, self.files[key]))
+
+
+def _shifted(value, dx: float, dy: float):
+    """Normalise drawing data to hashable tuples, moving coordinates by (-dx, -dy)."""
+    if isinstance(value, fitz.Point):
+        return round(value.x - dx, 2), round(value.y - dy, 2)
+    if isinstance(value, fitz.Rect):
+        return (
+            round(value.x0 - dx, 2), round(value.y0 - dy, 2),
+            round(value.x1 - dx, 2), round(value.y1 - dy, 2),
+        )
+    if isinstance(value, fitz.Quad):
+        return tuple(_shifted(p, dx, dy) for p in value)
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, (tuple, list)):
+        return tuple(_shifted(v, dx, dy) for v in value)
+    return value
+
+
+# per-page drawing keys that don't affect what a clip looks like
+_UNRENDERED_DRAWING_KEYS = frozenset({"rect", "seqno"})
+
+
+def _page_spans(page: fitz.Page) -> list[dict]:
+    """All text spans on *page* (without image blocks)."""
+    return [
+        span
+        for block in page.get_text("dict", flags=0)["blocks"]
+        for line in block.get("lines", ())
+        for span in line["spans"]
+    ]
+
 
+def _cluster_signature(
+    clip: fitz.Rect,
+    drawings: list[dict],
+    spans: list[dict],
+    images: list[dict],
+) -> str:
+    """Hash of everything that renders inside *clip*, relative to its top-left.
+
+    Two clips with the same signature render to the same pixels: same size,
+    same paths, text spans and images at the same offsets.
+    """
+    dx, dy = clip.x0, clip.y0
+
+    def inside(bbox) -> bool:
+        x0, y0, x1, y1 = bbox
+        return x0 < clip.x1 and clip.x0 < x1 and y0 < clip.y1 and clip.y0 < y1
+
+    paths = [
+        tuple(
+            (key, _shifted(value, dx, dy))
+            for key, value in sorted(d.items())
+            if key not in _UNRENDERED_DRAWING_KEYS
+        )
+        for d in drawings
+        if inside(d["rect"])
+    ]
+    text = [
+        (span["font"], round(span["size"], 2), span["color"], span["alpha"], span["flags"],
+         span["text"], _shifted(fitz.Point(span["origin"]), dx, dy))
+        for span in spans
+        if inside(span["bbox"])
+    ]
+    pictures = [
+        (info["digest"], _shifted(fitz.Rect(info["bbox"]), dx, dy), _shifted(info["transform"][:4], 0, 0))
+        for info in images
+        if inside(info["bbox"])
+    ]
+    size = (round(clip.width, 2), round(clip.height, 2))
+    return hashlib.sha256(repr((size, paths, text, pictures)).encode()).hexdigest()
+
+
+# What extraction can produce: embedded raster images and rendered vector
+# clusters.
+KINDS = frozenset({"images", "vectors"})
+
+
+def _iter_pages(
+    doc: fitz.Document,
+    page_nums: Iterable[int],
+    *,
+    dpi: int,
+    layers: bool,
+    bbox_scan: bool = False,
+    dedup: _Dedup | None = None,
+    hooks: ExtractHooks | None = None,
+    kinds: frozenset[str] = KINDS,
+    encoding: _Encoding = _PNG,
+    max_pixels: int | None = None,
+    doc_pixels: int | None = None,
+    budget: Budget | None = None,
+    skipped: list[tuple[int, str, tuple[float, ...]]] | None = None,
+) -> Iterator[tuple[str, bytes]]:
+    """Yield graphics from the pages of *doc* listed in *page_nums* as they are produced.
+
+    With *dedup*, outputs already recorded there are not extracted or
+    rendered again; the occurrence is only recorded as an alias. Stages for
+    kinds not in *kinds* are skipped entirely. *max_pixels* and
+    *doc_pixels* are the per-region and total pixel budgets for rendering;
+    regions left out for lack of *doc_pixels* are appended to *skipped* as
+    ``(page, name, clip)``.
+    *budget* is checked before each page and each cluster.
+    """
+    remaining = doc_pixels
+    want_images = "images" in kinds
+    want_vectors = "vectors" in kinds
+    for page_num in page_nums:
+        page = doc[page_num]
+        page_no = page_num + 1
+        if budget is not None:
+            budget.check(page_no)
+        prefix = f"page{page_no}"
+        if hooks is not None:
+            hooks.count("pages", 1)
+
+        # ---- embedded raster images ----
+        for img_idx, img in enumerate(page.get_images(full=True) if want_images else ()):
+            xref = img[0]
+            key = ("img", xref)
+            if dedup is not None and key in dedup.files:
+                ext = dedup.files[key].rsplit(".", 1)[-1]
+                dedup.alias(page_no, f"{prefix}_img{img_idx + 1}.{ext}", key)
+                continue
+            with _stage(hooks, "images"):
+                base = doc.extract_image(xref)
+            if not base:
+                continue
+            name = f"{prefix}_img{img_idx + 1}.{base['ext']}"
+            if dedup is not None:
+                dedup.add(page_no, name, key)
+            yield name, base["image"]
+
+        # ---- vector graphic clusters ----
+        if not want_vectors:
+            continue
+        # dedup needs the full path data for signatures; reuse it for clustering
+        drawings = None
+        if dedup is not None:
+            with _stage(hooks, "scan"):
+                drawings = page.get_drawings()
+        clusters = _page_drawing_clusters(
+            page, bbox_scan=bbox_scan, drawings=drawings, hooks=hooks,
+        )
+        if hooks is not None:
+            hooks.count("clusters", len(clusters))
+        if not clusters:
+            continue
+
+        if dedup is not None:
+            spans = _page_spans(page)
+            images = page.get_image_info(xrefs=True)
+
+        # layer mode: vector-only / text-only variants, built on first use
+        # and shared by every cluster on this page
+        layer_doc: fitz.Document | None = None
+        try:
+            for cl_idx, raw_clip in enumerate(clusters):
+                if budget is not None:
+                    budget.check(page_no)
+                clip = _padded_clip(raw_clip, page.rect)
+                if clip.width < 15 or clip.height < 15:
+                    continue
+
+                tag = f"{prefix}_vec{cl_idx + 1}"
+                suffixes = ("_vector", "_text") if layers else ("",)
+
+                ext = encoding.ext
+
+                if dedup is not None:
+                    signature = _cluster_signature(clip, drawings, spans, images)
+                    keys = [("vec", signature, suffix) for suffix in suffixes]
+                    if keys[0] in dedup.files:
+                        for suffix, key in zip(suffixes, keys):
+                            dedup.alias(page_no, f"{tag}{suffix}.{ext}", key)
+                        continue
+
+                # One DPI per region, so layer pairs keep identical dimensions
+                clip_dpi = dpi
+                if max_pixels is not None:
+                    clip_dpi = _fit_dpi(clip, clip_dpi, max_pixels)
+                if remaining is not None:
+                    clip_dpi = _fit_dpi(clip, clip_dpi, remaining // len(suffixes))
+                    if clip_dpi < min(dpi, _MIN_BUDGET_DPI):
+                        # document budget spent
+                        if skipped is not None:
+                            skipped.extend(
+                                (page_no, f"{tag}{suffix}.{ext}", tuple(clip)) for suffix in suffixes
+                            )
+                        continue
+                    remaining -= _clip_pixels(clip, clip_dpi) * len(suffixes)
+
+                if dedup is not None:
+                    for suffix, key in zip(suffixes, keys):
+                        dedup.add(page_no, f"{tag}{suffix}.{ext}", key)
+
+                if not layers:
+                    # Single combined render (original behaviour)
+                    yield f"{tag}.{ext}", _render_clip(page, clip, clip_dpi, hooks, encoding)
+                    continue
+
+                # --- layer mode: separate vector & text renders ---
+                if layer_doc is None:
+                    with _stage(hooks, "strip"):
+                        layer_doc, vec_page, txt_page = _make_layer_pages(doc, page_num)
+                yield f"{tag}_vector.{ext}", _render_clip(vec_page, clip, clip_dpi, hooks, encoding)
+                yield f"{tag}_text.{ext}", _render_clip(txt_page, clip, clip_dpi, hooks, encoding)
+        finally:
+            if layer_doc is not None:
+                layer_doc.close()
+
+
+def _page_chunks(page_nums: Sequence[int], chunks: int) -> list[Sequence[int]]:
+    """Split *page_nums* into at most *chunks* contiguous runs."""
+    chunks = max(1, min(chunks, len(page_nums)))
+    size, extra = divmod(len(page_nums), chunks)
+    runs: list[Sequence[int]] = []
+    start = 0
+    for i in range(chunks):
+        stop = start + size + (1 if i < extra else 0)
+        runs.append(page_nums[start:stop])
+        start = stop
+    return runs
+
+
+def _document_bytes(doc: fitz.Document) -> bytes:
+    """Return the original PDF bytes behind *doc* so workers can reopen it."""
+    if doc.stream is not None:
+        return bytes(doc.stream)
+    if doc.name and os.path.isfile(doc.name):
+        with open(doc.name, "rb") as f:
+            return f.read()
+    return doc.tobytes()
+
+
+# Per-process state for worker processes: each worker reopens the document
+# once from the original bytes (a fitz.Document can't cross processes).
+_worker_doc: fitz.Document | None = None
+
+
+def _init_worker(pdf_bytes: bytes) -> None:
+    global _worker_doc
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
 
-def _modify_stream(doc: fitz.Document, page: fitz.Page, fn) -> None:
-    """Apply *fn* to every content stream of *page* in *doc*."""
-    for xref in page.get_contents():
-        stream = doc.xref_stream(xref)
-        doc.update_stream(xref, fn(stream))
+
+def _extract_range_in_worker(
+    pages: Sequence[int],
+    options: dict,
+    dedup: bool,
+    instrument: bool = False,
+    budget: Budget | None = None,
+) -> tuple[list[tuple[str, bytes]], list[tuple[int, str, tuple, str]], list, list, ExtractionStopped | None]:
+    """Extract *pages*.
+
+    Also returns the range's manifest entries (with *dedup*), its recorded
+    hook events (with *instrument*) for the parent to replay, the regions
+    its pixel budget left out, and the :class:`ExtractionStopped` that cut
+    it short, if *budget* ran out; the items produced up to that point are
+    still returned.
+    """
+    assert _worker_doc is not None, "worker not initialised"
+    state = _Dedup() if dedup else None
+    recorder = _Recorder() if instrument else None
+    items: list[tuple[str, bytes]] = []
+    skipped: list[tuple[int, str, tuple[float, ...]]] = []
+    stopped = None
+    try:
+        for item in _iter_pages(
+            _worker_doc, pages, dedup=state, hooks=recorder, budget=budget, skipped=skipped,
+            **options,
+        ):
+            items.append(item)
+    except ExtractionStopped as exc:
+        stopped = exc
+    return (
+        items, state.entries if state else [], recorder.events if recorder else [], skipped,
+        stopped,
+    )
+
+
+# Ranges handed out per worker; >1 so a few slow pages don't leave
+# the other workers idle at the end of the run.
+_CHUNKS_PER_WORKER = 4
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
+def _manifest(entries: list[tuple[int, str, tuple, str]]) -> bytes:
+    return json.dumps(
+        [{"page": page_no, "name": name, "file": file} for page_no, name, _, file in entries],
+        indent=2,
+    ).encode()
+
+
+def _skipped(regions: list[tuple[int, str, tuple[float, ...]]]) -> bytes:
+    return json.dumps(
+        [
+            {"page": page_no, "name": name, "bbox": [round(v, 2) for v in clip]}
+            for page_no, name, clip in regions
+        ],
+        indent=2,
+    ).encode()
+
+
+def parse_pages(spec: str, page_count: int) -> list[int]:
+    """Turn a page spec like ``"1-3,7,10-"`` into sorted 1-based page numbers.
+
+    Ranges are inclusive; an open end (``"10-"``) runs to the last page.
+    Raises ValueError for malformed specs or pages outside the document.
+    """
+    pages: set[int] = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        try:
+            start = int(first)
+            stop = (int(last) if last else page_count) if dash else start
+        except ValueError:
+            raise ValueError(f"invalid page range: {part!r}") from None
+        if start < 1 or stop > page_count or start > stop:
+            raise ValueError(f"page range {part!r} is outside 1-{page_count}")
+        pages.update(range(start, stop + 1))
+    if not pages:
+        raise ValueError("no pages selected")
+    return sorted(pages)
+
+
+def _select_pages(page_count: int, pages: Iterable[int] | None) -> Sequence[int]:
+    """Return the 0-based page indexes for 1-based *pages* (all when None)."""
+    if pages is None:
+        return range(page_count)
+    selected = sorted(set(pages))
+    for page_no in selected:
+        if not 1 <= page_no <= page_count:
+            raise ValueError(f"page {page_no} is outside 1-{page_count}")
+    return [page_no - 1 for page_no in selected]
+
+
+def check_options(
+    *,
+    kinds: Iterable[str] = KINDS,
+    render_format: str = "png",
+    quality: int = 85,
+    png_level: int | None = None,
+    alpha: bool = False,
+    **_: object,
+) -> None:
+    """Raise ValueError for options :func:`extract_all` would reject.
+
+    For validating user input before a document is opened; page numbers
+    can only be checked against the document itself.
+    """
+    _check_kinds(kinds)
+    _Encoding(render_format, quality, png_level, alpha)
+
+
+def _check_kinds(kinds: Iterable[str]) -> frozenset[str]:
+    kinds = frozenset(kinds)
+    if unknown := kinds - KINDS:
+        raise ValueError(f"unknown kinds: {', '.join(sorted(unknown))}")
+    if not kinds:
+        raise ValueError(f"no kinds selected; choose from: {', '.join(sorted(KINDS))}")
+    return kinds
+
+
+def iter_extract(
+    doc: fitz.Document,
+    *,
+    dpi: int = 200,
+    layers: bool = False,
+    workers: int = 1,
+    bbox_scan: bool = False,
+    dedup: bool = False,
+    hooks: ExtractHooks | None = None,
+    pages: Iterable[int] | None = None,
+    kinds: Iterable[str] = KINDS,
+    render_format: str = "png",
+    quality: int = 85,
+    png_level: int | None = None,
+    alpha: bool = False,
+    max_pixels: int | None = None,
+    doc_pixels: int | None = None,
+    budget: Budget | None = None,
+    partial: bool = False,
+) -> Iterator[tuple[str, bytes]]:
+    """Yield ``(filename, data)`` for each graphic in *doc* as soon as it is produced.
+
+    Takes the same options as :func:`extract_all` and yields the same items
+    in the same order, but only keeps the current item (or, with *workers*,
+    a bounded window of page ranges) in memory.
+    """
+    # validated before the first item so bad options fail up front
+    page_nums = _select_pages(len(doc), pages)
+    requested = len(page_nums)
+    if budget is not None and budget.pages is not None and requested > budget.pages:
+        stopped = ExtractionStopped(STOP_PAGES, page_nums[budget.pages] + 1)
+        if not partial:
+            raise stopped
+        budget.stopped = stopped
+        page_nums = page_nums[:budget.pages]
+    options = {
+        "dpi": dpi,
+        "layers": layers,
+        "bbox_scan": bbox_scan,
+        "kinds": _check_kinds(kinds),
+        "encoding": _Encoding(render_format, quality, png_level, alpha),
+        "max_pixels": max_pixels,
+        "doc_pixels": doc_pixels,
+    }
+    items = _iter_extract(
+        doc, page_nums, options, workers=workers, dedup=dedup, hooks=hooks,
+        budget=budget, partial=partial,
+    )
+    if budget is not None and partial:
+        items = _mark_incomplete(items, budget, requested)
+    return items if hooks is None else _count_items(items, hooks)
+
+
+def _mark_incomplete(
+    items: Iterator[tuple[str, bytes]], budget: Budget, requested: int
+) -> Iterator[tuple[str, bytes]]:
+    yield from items
+    if budget.stopped is not None:
+        yield INCOMPLETE_NAME, _incomplete(budget.stopped, requested)
+
+
+def _count_items(
+    items: Iterator[tuple[str, bytes]], hooks: ExtractHooks
+) -> Iterator[tuple[str, bytes]]:
+    for name, data in items:
+        hooks.count("items", 1)
+        hooks.count("bytes", len(data))
+        yield name, data
+
+
+def _iter_extract(
+    doc: fitz.Document,
+    page_nums: Sequence[int],
+    options: dict,
+    *,
+    workers: int,
+    dedup: bool,
+    hooks: ExtractHooks | None,
+    budget: Budget | None,
+    partial: bool,
+) -> Iterator[tuple[str, bytes]]:
+    # With *partial*, running out of time ends the pages early but still
+    # writes the manifest; cancellation always raises.
+    skipped: list[tuple[int, str, tuple[float, ...]]] = []
+    if workers <= 1 or len(page_nums) < 2:
+        state = _Dedup() if dedup else None
+        try:
+            yield from _iter_pages(
+                doc, page_nums, dedup=state, hooks=hooks, budget=budget, skipped=skipped,
+                **options,
+            )
+        except ExtractionStopped as exc:
+            if not partial or exc.reason == STOP_CANCELLED:
+                raise
+            budget.stopped = exc
+        if state is not None:
+            yield "manifest.json", _manifest(state.entries)
+        if skipped:
+            yield SKIPPED_NAME, _skipped(skipped)
+        return
+
+    # Each worker range deduplicates on its own; keys seen in an earlier
+    # range are resolved here so repeats across ranges are dropped too.
+    files: dict[tuple, str] = {}
+    manifest: list[tuple[int, str, tuple, str]] = []
+    instrument = hooks is not None
+    ranges = _page_chunks(page_nums, workers * _CHUNKS_PER_WORKER)
+    worker_budget = budget._for_worker() if budget is not None else None
+
+    def range_options(pages: Sequence[int]) -> dict:
+        # workers can't share one budget; each range gets its page share
+        if options["doc_pixels"] is None:
+            return options
+        return {**options, "doc_pixels": options["doc_pixels"] * len(pages) // len(page_nums)}
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ranges)),
+        initializer=_init_worker,
+        initargs=(_document_bytes(doc),),
+    ) as pool:
+        # Keep a bounded window of ranges in flight and yield in submission
+        # order: page order is preserved and finished-but-unconsumed results
+        # can't pile up when the consumer is slower than the workers.
+        pending: deque[Future] = deque()
+        todo = iter(ranges)
+        try:
+            for pages in islice(todo, workers * 2):
+                pending.append(pool.submit(
+                    _extract_range_in_worker, pages, range_options(pages), dedup, instrument,
+                    worker_budget,
+                ))
+            while pending:
+                future = pending.popleft()
+                if budget is not None and budget.cancel is not None:
+                    while not futures_wait([future], timeout=0.1).done:
+                        if budget.cancelled:
+                            raise ExtractionStopped(STOP_CANCELLED)
+                items, entries, events, range_skipped, stopped = future.result()
+                if instrument:
+                    _Recorder.replay(events, hooks)
+                if stopped is not None and not partial:
+                    raise stopped
+                for pages in islice(todo, 0 if stopped else 1):
+                    pending.append(pool.submit(
+                        _extract_range_in_worker, pages, range_options(pages), dedup, instrument,
+                        worker_budget,
+                    ))
+                dropped: set[str] = set()
+                for page_no, name, key, file in entries:
+                    if key in files:
+                        if name == file:
+                            dropped.add(name)
+                        file = files[key]
+                    else:
+                        files[key] = file
+                    manifest.append((page_no, name, key, file))
+                for name, data in items:
+                    if name not in dropped:
+                        yield name, data
+                skipped += range_skipped
+                if stopped is not None:
+                    # later ranges may have got further; keep the output
+                    # a contiguous run of pages
+                    budget.stopped = stopped
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+    if dedup:
+        yield "manifest.json", _manifest(manifest)
+    if skipped:
+        yield SKIPPED_NAME, _skipped(skipped)
+
+
 def extract_all(
     doc: fitz.Document,
     *,
     dpi: int = 200,
     layers: bool = False,
+    workers: int = 1,
+    bbox_scan: bool = False,
+    dedup: bool = False,
+    hooks: ExtractHooks | None = None,
+    pages: Iterable[int] | None = None,
+    kinds: Iterable[str] = KINDS,
+    render_format: str = "png",
+    quality: int = 85,
+    png_level: int | None = None,
+    alpha: bool = False,
+    max_pixels: int | None = None,
+    doc_pixels: int | None = None,
+    budget: Budget | None = None,
+    partial: bool = False,
 ) -> list[tuple[str, bytes]]:
     """Extract graphics from a PDF document.
 
@@ -217,50 +1376,391 @@ def extract_all(
     If *layers* is True, each vector cluster that overlaps with text produces
     two PNGs at **identical dimensions** — one with vectors only and one with
     text only — so they can be reassembled later.
+
+    If *workers* is greater than 1, page ranges are split across that many
+    worker processes, each reopening the document from its original bytes.
+    Output names and order are identical to the single-process run.
+
+    If *bbox_scan* is True, vector clusters are found by scanning the
+    content stream for path geometry instead of building full
+    ``get_drawings()`` path data. The clusters are the same; peak memory on
+    drawing-heavy pages is about a fifth.
+
+    If *dedup* is True, each image xref is extracted once and vector
+    clusters whose rendered content and size match an earlier cluster are
+    not rendered again. A final ``manifest.json`` lists every occurrence
+    (page, name) with the file that holds its data.
+
+    *pages* limits extraction to those 1-based page numbers (see
+    :func:`parse_pages` for ``"1-3,7"`` style specs); other pages are never
+    loaded. *kinds* selects ``"images"`` and/or ``"vectors"``; with only
+    images, no drawing scan, clustering or rendering is done at all.
+
+    Rendered regions are PNG by default. *render_format* may also be
+    ``"jpeg"`` or ``"webp"`` (needs Pillow), encoded at *quality*; for PNG,
+    *png_level* sets the zlib level (0-9) instead of MuPDF's default.
+    *alpha* renders with a transparent background (not for JPEG). Embedded
+    images are always returned as stored.
+
+    *max_pixels* caps each rendered region: larger ones are rendered at a
+    lower DPI to fit. *doc_pixels* caps the total for the document; regions
+    get lower DPI as it runs out and are skipped once they would drop below
+    36 DPI (with *workers*, each page range gets its share of the budget).
+    A final ``skipped.json`` lists the skipped regions by page, name and
+    bounding box.
+    Layer-mode pairs always share one DPI, so they keep identical sizes.
+
+    *budget* (see :class:`Budget`) limits wall-clock time and page count
+    and carries a cancel flag; it is checked before every page and vector
+    cluster. When it runs out, :class:`ExtractionStopped` is raised, or
+    with *partial* the items extracted so far are kept (plus the manifest,
+    with *dedup*) and a final ``incomplete.json`` says where and why
+    extraction stopped. A page budget is applied before any work starts.
+    Cancellation always raises. With *workers*, the output ends at the
+    first page range that ran out of time; the cancel flag is polled in
+    this process while waiting for ranges, and ranges already running
+    finish first.
+
+    *hooks* receives per-stage timings and counts (see :class:`ExtractHooks`);
+    with *workers*, events recorded in the workers are replayed into it as
+    each page range completes.
+
+    This is ``list(iter_extract(...))``; use :func:`iter_extract` to handle
+    items one at a time.
     """
-    results: list[tuple[str, bytes]] = []
+    return list(iter_extract(
+        doc, dpi=dpi, layers=layers, workers=workers, bbox_scan=bbox_scan, dedup=dedup,
+        hooks=hooks, pages=pages, kinds=kinds, render_format=render_format,
+        quality=quality, png_level=png_level, alpha=alpha, max_pixels=max_pixels,
+        doc_pixels=doc_pixels, budget=budget, partial=partial,
+    ))
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        prefix = f"page{page_num + 1}"
 
-        # ---- embedded raster images ----
-        for img_idx, img in enumerate(page.get_images(full=True)):
-            xref = img[0]
-            base = doc.extract_image(xref)
-            if not base:
-                continue
-            results.append((f"{prefix}_img{img_idx + 1}.{base['ext']}", base["image"]))
+# ---------------------------------------------------------------------------
+# Inspection & on-demand rendering
+# ---------------------------------------------------------------------------
 
-        # ---- vector graphic clusters ----
-        clusters = _page_drawing_clusters(page)
-        if not clusters:
-            continue
+# extract_image() passes these encodings through as-is; everything else
+# comes out as PNG.
+_FILTER_EXT = {"DCTDecode": "jpeg", "JPXDecode": "jpx", "JBIG2Decode": "jb2"}
+
+_ITEM_NAME_RE = re.compile(
+    r"page(?P<page>\d+)_(?P<kind>img|vec)(?P<index>\d+)(?:_(?P<layer>vector|text))?\.(?P<ext>\w+)"
+)
 
-        for cl_idx, raw_clip in enumerate(clusters):
+
+def _stream_length(doc: fitz.Document, xref: int) -> int | None:
+    kind, value = doc.xref_get_key(xref, "Length")
+    if kind == "xref":
+        value = doc.xref_object(int(value.split()[0]))
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def inspect(
+    doc: fitz.Document,
+    *,
+    pages: Iterable[int] | None = None,
+    bbox_scan: bool = False,
+) -> dict:
+    """Describe the graphics :func:`extract_all` would produce, without rendering.
+
+    Returns a JSON-serialisable dict with one entry per page listing its
+    embedded images (xref, pixel size, output format, stored stream size)
+    and its vector regions (the padded clip in PDF points that would be
+    rendered). Every item carries the ``name`` it gets in an extraction
+    archive; pass that to :func:`render_item`.
+    """
+    result = []
+    for page_num in _select_pages(len(doc), pages):
+        page = doc[page_num]
+        prefix = f"page{page_num + 1}"
+        images = []
+        for img_idx, img in enumerate(page.get_images(full=True)):
+            xref, _, width, height, bpc, colorspace, _, _, filter_name = img[:9]
+            ext = _FILTER_EXT.get(filter_name, "png")
+            images.append({
+                "name": f"{prefix}_img{img_idx + 1}.{ext}",
+                "xref": xref,
+                "width": width,
+                "height": height,
+                "bpc": bpc,
+                "colorspace": colorspace,
+                "format": ext,
+                "stream_bytes": _stream_length(doc, xref),
+            })
+        vectors = []
+        for cl_idx, raw_clip in enumerate(_page_drawing_clusters(page, bbox_scan=bbox_scan)):
             clip = _padded_clip(raw_clip, page.rect)
             if clip.width < 15 or clip.height < 15:
                 continue
+            vectors.append({
+                "name": f"{prefix}_vec{cl_idx + 1}.png",
+                "bbox": list(clip),
+            })
+        result.append({
+            "page": page_num + 1,
+            "width": page.rect.width,
+            "height": page.rect.height,
+            "images": images,
+            "vectors": vectors,
+        })
+    return {"page_count": len(doc), "pages": result}
 
-            tag = f"{prefix}_vec{cl_idx + 1}"
 
-            if not layers:
-                # Single combined render (original behaviour)
-                results.append((f"{tag}.png", _render_clip(page, clip, dpi)))
-                continue
+def render_region(
+    doc: fitz.Document,
+    page_no: int,
+    bbox: Iterable[float],
+    *,
+    dpi: int = 200,
+    layer: str | None = None,
+    max_pixels: int | None = None,
+) -> bytes:
+    """Render *bbox* (PDF points) of 1-based page *page_no* as PNG bytes.
+
+    *layer* is ``None`` for the page as is, or ``"vector"`` / ``"text"`` for
+    the same variants layer mode produces; both render at identical
+    dimensions for the same *bbox* and *dpi*. With *max_pixels*, a region
+    that would be larger is rendered at a lower DPI, as in extraction.
+    """
+    with _RegionRenderer(doc) as renderer:
+        return renderer.render(page_no, bbox, dpi, layer, max_pixels)
+
+
+class _RegionRenderer:
+    """Renders regions of *doc*, building each page's layer copies only once.
+
+    Use as a context manager; the layer copies are closed on exit.
+    """
+
+    def __init__(self, doc: fitz.Document) -> None:
+        self.doc = doc
+        self._layer_pages: dict[int, tuple[fitz.Document, fitz.Page, fitz.Page]] = {}
 
-            # --- layer mode: separate vector & text renders ---
+    def __enter__(self) -> _RegionRenderer:
+        return self
 
-            # Vector-only: remove text
-            vec_doc, vec_page = _make_temp_page(doc, page_num)
-            _modify_stream(vec_doc, vec_page, _strip_text)
-            results.append((f"{tag}_vector.png", _render_clip(vec_page, clip, dpi)))
-            vec_doc.close()
+    def __exit__(self, *exc_info: object) -> None:
+        for layer_doc, _, _ in self._layer_pages.values():
+            layer_doc.close()
+        self._layer_pages.clear()
 
-            # Text-only: remove vectors
-            txt_doc, txt_page = _make_temp_page(doc, page_num)
-            _modify_stream(txt_doc, txt_page, _strip_vectors)
-            results.append((f"{tag}_text.png", _render_clip(txt_page, clip, dpi)))
-            txt_doc.close()
+    def render(
+        self,
+        page_no: int,
+        bbox: Iterable[float],
+        dpi: int,
+        layer: str | None,
+        max_pixels: int | None,
+    ) -> bytes:
+        doc = self.doc
+        if not 1 <= page_no <= len(doc):
+            raise ValueError(f"page {page_no} is outside 1-{len(doc)}")
+        clip = fitz.Rect(bbox)
+        if max_pixels is not None:
+            dpi = _fit_dpi(clip, dpi, max_pixels)
+        if layer is None:
+            return _render_clip(doc[page_no - 1], clip, dpi)
+        if layer not in ("vector", "text"):
+            raise ValueError(f"unknown layer: {layer!r}")
+        layer_pages = self._layer_pages.get(page_no)
+        if layer_pages is None:
+            layer_pages = self._layer_pages[page_no] = _make_layer_pages(doc, page_no - 1)
+        _, vec_page, txt_page = layer_pages
+        return _render_clip(vec_page if layer == "vector" else txt_page, clip, dpi)
 
+
+def render_item(
+    doc: fitz.Document,
+    manifest: dict,
+    name: str,
+    *,
+    dpi: int = 200,
+    max_pixels: int | None = None,
+) -> bytes:
+    """Produce the archive item *name* listed in *manifest* (from :func:`inspect`).
+
+    Images are returned as extracted, whatever *dpi*. Vector regions are
+    rendered at *dpi*, lowered as needed to stay within *max_pixels*; a
+    ``_vector`` / ``_text`` suffix before ``.png`` selects a layer. Raises
+    KeyError for names not in *manifest*.
+    """
+    return render_items(doc, manifest, [name], dpi=dpi, max_pixels=max_pixels)[0][1]
+
+
+def render_items(
+    doc: fitz.Document,
+    manifest: dict,
+    names: Iterable[str],
+    *,
+    dpi: int = 200,
+    max_pixels: int | None = None,
+) -> list[tuple[str, bytes]]:
+    """Produce several items like :func:`render_item`, as ``(name, data)`` in order.
+
+    The vector-only and text-only copies of a page are built once and
+    shared by all of its ``_vector`` / ``_text`` items.
+    """
+    results: list[tuple[str, bytes]] = []
+    with _RegionRenderer(doc) as renderer:
+        for name in names:
+            match = _ITEM_NAME_RE.fullmatch(name)
+            if match is None:
+                raise KeyError(name)
+            page_no = int(match["page"])
+            page = next((p for p in manifest["pages"] if p["page"] == page_no), None)
+            if page is None:
+                raise KeyError(name)
+            if match["kind"] == "img":
+                if match["layer"]:
+                    raise KeyError(name)
+                entry = next((i for i in page["images"] if i["name"] == name), None)
+                base = doc.extract_image(entry["xref"]) if entry else None
+                if not base:
+                    raise KeyError(name)
+                results.append((name, base["image"]))
+                continue
+            base_name = f"page{page_no}_vec{match['index']}.png"
+            entry = next((v for v in page["vectors"] if v["name"] == base_name), None)
+            if entry is None or match["ext"] != "png":
+                raise KeyError(name)
+            data = renderer.render(page_no, entry["bbox"], dpi, match["layer"], max_pixels)
+            results.append((name, data))
     return results
+
+
+# ---------------------------------------------------------------------------
+# Pre-checks
+# ---------------------------------------------------------------------------
+
+class DocumentTooLarge(Exception):
+    """Raised by :func:`precheck` when a document is over one of its limits."""
+
+    def __init__(self, what: str, value: int, limit: int) -> None:
+        super().__init__(what, value, limit)
+        self.what = what
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return f"{self.what} ({self.value:,}) is over the limit of {self.limit:,}"
+
+
+# Inflated per step while measuring content streams, so a compression
+# bomb is never expanded much past the limit.
+_INFLATE_STEP = 1 << 20
+
+
+def _content_length(doc: fitz.Document, xref: int, limit: int) -> int:
+    """Decoded length of stream *xref*, counting no further than just past *limit*.
+
+    Only plain FlateDecode is measured by inflating; for other filters the
+    stored length is used, as decoding them would cost what we're avoiding.
+    """
+    raw = doc.xref_stream_raw(xref) or b""
+    kind, value = doc.xref_get_key(xref, "Filter")
+    if kind == "null":
+        return len(raw)
+    if value.strip("[] ") != "/FlateDecode":
+        return len(raw)
+    inflater = zlib.decompressobj()
+    length = 0
+    data = raw
+    try:
+        while data and length <= limit:
+            length += len(inflater.decompress(data, _INFLATE_STEP))
+            data = inflater.unconsumed_tail
+    except zlib.error:
+        pass  # MuPDF renders what it can of a damaged stream; so do we
+    return length
+
+
+def precheck(
+    doc: fitz.Document,
+    *,
+    pages: Iterable[int] | None = None,
+    dpi: int = 200,
+    max_pixels: int | None = None,
+    max_pages: int | None = None,
+    max_image_pixels: int | None = None,
+    max_content_bytes: int | None = None,
+    max_memory: int | None = None,
+) -> dict:
+    """Cheaply measure *doc* and raise :class:`DocumentTooLarge` if it's hopeless.
+
+    Meant to run right after opening, before anything is extracted:
+
+    - *max_pages* caps the document's page count;
+    - *max_image_pixels* caps the total pixel area of the distinct images
+      on the selected *pages* (from their dictionaries, nothing is decoded);
+    - *max_content_bytes* caps the decoded size of the selected pages'
+      content streams, inflated step by step so a compression bomb is
+      stopped just past the limit;
+    - *max_memory* caps an estimate of the peak memory extraction needs:
+      the PDF bytes, plus the largest content stream, plus the largest
+      decoded image, plus the largest region rendered at *dpi* (a whole
+      page, or *max_pixels*) at 4 bytes per pixel.
+
+    Returns the measured figures (``content_bytes`` is None when neither
+    content nor memory is limited). Form XObjects and inline images are not
+    counted.
+    """
+    if max_pages is not None and len(doc) > max_pages:
+        raise DocumentTooLarge("page count", len(doc), max_pages)
+    page_nums = _select_pages(len(doc), pages)
+
+    image_pixels = 0
+    largest_image = 0
+    seen: set[int] = set()
+    largest_page = 0
+    for page_num in page_nums:
+        page = doc[page_num]
+        largest_page = max(largest_page, _clip_pixels(page.rect, dpi))
+        for img in page.get_images(full=True):
+            if img[0] in seen:
+                continue
+            seen.add(img[0])
+            pixels = img[2] * img[3]
+            image_pixels += pixels
+            largest_image = max(largest_image, pixels)
+        if max_image_pixels is not None and image_pixels > max_image_pixels:
+            raise DocumentTooLarge("total image pixels", image_pixels, max_image_pixels)
+
+    # content streams are only measured when a limit needs them
+    content_bytes: int | None = None
+    largest_content = 0
+    if max_content_bytes is not None or max_memory is not None:
+        content_bytes = 0
+        for page_num in page_nums:
+            limit = max_memory if max_memory is not None else max_content_bytes
+            if max_content_bytes is not None:
+                limit = min(limit, max_content_bytes - content_bytes)
+            page_content = 0
+            for xref in doc[page_num].get_contents():
+                page_content += _content_length(doc, xref, limit - page_content)
+            content_bytes += page_content
+            largest_content = max(largest_content, page_content)
+            if max_content_bytes is not None and content_bytes > max_content_bytes:
+                raise DocumentTooLarge("content stream bytes", content_bytes, max_content_bytes)
+            if max_memory is not None and page_content > max_memory:
+                break  # the memory estimate below fails on this page alone
+
+    render_pixels = largest_page if max_pixels is None else min(largest_page, max_pixels)
+    if doc.stream is not None:
+        pdf_size = len(doc.stream)
+    elif doc.name and os.path.isfile(doc.name):
+        pdf_size = os.path.getsize(doc.name)
+    else:
+        pdf_size = 0
+    memory = pdf_size + largest_content + (largest_image + int(render_pixels)) * 4
+    if max_memory is not None and memory > max_memory:
+        raise DocumentTooLarge("estimated memory", memory, max_memory)
+    return {
+        "pages": len(page_nums),
+        "image_pixels": image_pixels,
+        "content_bytes": content_bytes,
+        "memory": memory,
+    }
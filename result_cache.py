@@ -0,0 +1,101 @@
+"""In-memory LRU cache for finished extraction results.
+
+Entries are keyed by a SHA-256 of the uploaded PDF plus the extraction
+options, bounded by total size in bytes, and expire after a TTL. Nothing is
+ever written to disk; a cache with ``max_bytes=0`` is disabled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+def cache_key(pdf_bytes: bytes, **options: Any) -> str:
+    """Content address for *pdf_bytes* extracted with *options*."""
+    digest = hashlib.sha256(pdf_bytes)
+    for name in sorted(options):
+        digest.update(f"\0{name}={options[name]!r}".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, *, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached value for *key*, or None if absent or expired."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store *value*, evicting least recently used entries to fit."""
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._purge_expired()
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            self._drop(key)
+            self._expirations += 1
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._purge_expired()
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,34 @@
+"""Rectangle clustering against the original fixpoint implementation."""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+import fitz
+
+from benchmarks.bench_cluster import _random_rects, _reference_cluster_rects
+from pdf_extract import _cluster_rects
+
+
+class ClusterRectsTest(unittest.TestCase):
+    def test_matches_reference(self) -> None:
+        rng = random.Random(0)
+        for case in range(2000):
+            extent = rng.choice([100, 600, 2000])
+            rects = _random_rects(
+                rng, rng.randint(0, 80), extent, extent, rng.choice([10, 100, 400]),
+            )
+            gap = rng.choice([0.0, 1.0, 5.0, 20.0, 37.5])
+            expected = [tuple(r) for r in _reference_cluster_rects(rects, gap)]
+            actual = [tuple(r) for r in _cluster_rects(rects, gap)]
+            self.assertEqual(actual, expected, f"case {case} (gap={gap}): {rects}")
+
+    def test_neighbours_merge_transitively(self) -> None:
+        rects = [fitz.Rect(0, 0, 10, 10), fitz.Rect(25, 0, 35, 10), fitz.Rect(50, 0, 60, 10)]
+        self.assertEqual(_cluster_rects(rects, gap=20), [fitz.Rect(0, 0, 60, 10)])
+        self.assertEqual(len(_cluster_rects(rects, gap=5)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
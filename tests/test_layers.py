@@ -0,0 +1,26 @@
+"""Layer mode against the original per-cluster implementation."""
+
+from __future__ import annotations
+
+import unittest
+
+import fitz
+
+from benchmarks.bench_layers import _per_cluster_layers
+from benchmarks.corpus import clustered_document
+from pdf_extract import extract_all
+
+
+class LayersTest(unittest.TestCase):
+    def test_matches_per_cluster_reference(self) -> None:
+        doc = fitz.open(stream=clustered_document(2, 3), filetype="pdf")
+        try:
+            expected = _per_cluster_layers(doc)
+            self.assertTrue(expected)
+            self.assertEqual(extract_all(doc, layers=True), expected)
+        finally:
+            doc.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Content-stream drawing scan against get_drawings()."""
+
+from __future__ import annotations
+
+import unittest
+
+import fitz
+
+from benchmarks import corpus
+from pdf_extract import _page_drawing_clusters
+
+# MuPDF bounds paths in single precision; the scanner works in doubles.
+_TOLERANCE = 0.01
+
+
+class BboxScanTest(unittest.TestCase):
+    def assertSameRects(self, actual: list[fitz.Rect], expected: list[fitz.Rect], msg: str) -> None:
+        self.assertEqual(len(actual), len(expected), msg)
+        for ra, rb in zip(actual, expected):
+            for p, q in zip(ra, rb):
+                self.assertLessEqual(abs(p - q), _TOLERANCE, f"{msg}: {ra} vs {rb}")
+
+    def test_matches_get_drawings_on_corpus(self) -> None:
+        documents = {
+            "mixed": corpus.mixed_document(3),
+            "clustered": corpus.clustered_document(3),
+            "drawing": corpus.drawing_document(3, 2000),
+            "repeated_logo": corpus.repeated_logo_document(3),
+            "text_over_vector": corpus.text_over_vector_document(3),
+        }
+        for name, data in documents.items():
+            doc = fitz.open(stream=data, filetype="pdf")
+            for page in doc:
+                self.assertSameRects(
+                    _page_drawing_clusters(page, bbox_scan=True),
+                    _page_drawing_clusters(page),
+                    f"{name} page {page.number + 1}",
+                )
+            doc.close()
+
+    def test_skips_inline_images_and_strings(self) -> None:
+        doc = fitz.open()
+        page = doc.new_page()
+        xref = doc.get_new_xref()
+        doc.update_object(xref, "<<>>")
+        doc.update_stream(
+            xref,
+            b"q 10 0 0 10 50 50 cm BI /W 2 /H 2 /BPC 8 /CS /G ID \x00re\xff EI Q"
+            b" BT /F1 12 Tf (a (nested) re) Tj ET 1 0 0 RG 100 100 m 200 300 l S"
+            b" q 2 0 0 2 0 0 cm 10 10 50 50 re f Q",
+        )
+        doc.xref_set_key(page.xref, "Contents", f"{xref} 0 R")
+        page = doc[0]
+        self.assertSameRects(
+            _page_drawing_clusters(page, bbox_scan=True), _page_drawing_clusters(page), "inline",
+        )
+        doc.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
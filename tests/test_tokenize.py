@@ -0,0 +1,91 @@
+"""Content-stream tokenizer and layer split against the original implementations."""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+from benchmarks.bench_tokenize import (
+    _reference_split_layers,
+    _reference_tokenize,
+    _strip_text,
+    _strip_vectors,
+)
+from pdf_extract import _split_layers, _tokenize
+
+# Fragments biased towards the syntax the tokenizer has to get right.
+_FRAGMENTS = [
+    b" ", b"\n", b"\r\n", b"\t", b"\x00", b"\x0c", b"  ",
+    b"q", b"Q", b"BT", b"ET", b"cm", b"re", b"f", b"f*", b"S", b"n", b"Tj", b"TJ",
+    b"1", b"0.5", b"-12.75", b"/F1", b"/Name#20x", b"/", b"[", b"]", b"{", b"}",
+    b"<<", b">>", b">", b")", b"<48656c6c6f>", b"<>",
+    b"(", b"(abc)", b"(a(b)c)", b"(esc\\)aped)", b"(\\\\)", b"(\\", b"(open",
+    b"%comment", b"%", b"\\",
+]
+# Operators the layer split acts on, and tokens that only look like them.
+_LAYER_FRAGMENTS = [
+    b"BT", b"ET", b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*",
+    b"ff", b"BTx", b"f*x", b"/BT", b"(BT)", b"(a(ET)b)", b"<4254>", b"%BT\n",
+]
+
+
+def _random_stream(rng: random.Random, fragments: list[bytes] = _FRAGMENTS) -> bytes:
+    parts = []
+    for _ in range(rng.randint(0, 40)):
+        if rng.random() < 0.1:
+            parts.append(bytes(rng.getrandbits(8) for _ in range(rng.randint(1, 4))))
+        else:
+            parts.append(rng.choice(fragments))
+    return b"".join(parts)
+
+
+def _run(fn, stream: bytes):
+    try:
+        return fn(stream)
+    except ValueError:
+        return ValueError
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_matches_reference(self) -> None:
+        rng = random.Random(0)
+        for case in range(2000):
+            stream = _random_stream(rng)
+            expected = _run(lambda s: list(_reference_tokenize(s)), stream)
+            actual = _run(lambda s: list(_tokenize(s)), stream)
+            self.assertEqual(actual, expected, f"case {case}: {stream!r}")
+            if actual is not ValueError:
+                self.assertEqual(b"".join(raw for raw, _ in actual), stream)
+
+    def test_nested_and_unterminated_strings(self) -> None:
+        self.assertEqual(
+            list(_tokenize(b"(a(b)c) Tj")),
+            [(b"(a(b)c)", "string"), (b" ", "ws"), (b"Tj", "token")],
+        )
+        self.assertEqual(list(_tokenize(b"(open")), [(b"(open", "string")])
+
+    def test_unterminated_hex_string(self) -> None:
+        with self.assertRaises(ValueError):
+            list(_tokenize(b"1 0 0 RG <4142"))
+
+
+class SplitLayersTest(unittest.TestCase):
+    def test_matches_reference(self) -> None:
+        rng = random.Random(0)
+        fragments = _FRAGMENTS + _LAYER_FRAGMENTS * 2
+        for case in range(3000):
+            stream = _random_stream(rng, fragments)
+            expected = _run(_reference_split_layers, stream)
+            self.assertEqual(_run(_split_layers, stream), expected, f"case {case}: {stream!r}")
+            if expected is not ValueError:
+                self.assertEqual(expected, (_strip_text(stream), _strip_vectors(stream)))
+
+    def test_split(self) -> None:
+        stream = b"0 0 m 9 9 l S BT /F1 9 Tf (f) Tj ET 1 1 5 5 re f*"
+        no_text, no_vectors = _split_layers(stream)
+        self.assertEqual(no_text, b"0 0 m 9 9 l S  1 1 5 5 re f*")
+        self.assertEqual(no_vectors, b"0 0 m 9 9 l n BT /F1 9 Tf (f) Tj ET 1 1 5 5 re n")
+
+
+if __name__ == "__main__":
+    unittest.main()
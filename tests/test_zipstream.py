@@ -0,0 +1,75 @@
+"""Streaming ZIP writer, read back with the standard library's zipfile."""
+
+from __future__ import annotations
+
+import io
+import unittest
+import zipfile
+from unittest import mock
+
+import zipstream
+from zipstream import ZipWriter, stream_zip
+
+
+def _read(entries: list[tuple[str, bytes]]) -> zipfile.ZipFile:
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(entries))))
+    assert archive.testzip() is None
+    return archive
+
+
+class StreamZipTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        entries = [
+            ("page1_img1.png", b"\x89PNG" + bytes(range(256)) * 40),
+            ("manifest.json", b'{"pages": []}' * 500),
+            ("empty.txt", b""),
+            ("mapp/ö ü.txt", "unicode name".encode()),
+        ]
+        archive = _read(entries)
+        self.assertEqual(archive.namelist(), [name for name, _ in entries])
+        for name, data in entries:
+            self.assertEqual(archive.read(name), data)
+
+    def test_precompressed_entries_are_stored(self) -> None:
+        archive = _read([("a.png", b"x" * 1000), ("b.JPG", b"x" * 1000), ("c.json", b"x" * 1000)])
+        methods = [info.compress_type for info in archive.infolist()]
+        self.assertEqual(methods, [zipfile.ZIP_STORED, zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+
+    def test_empty_archive(self) -> None:
+        self.assertEqual(_read([]).namelist(), [])
+
+    def test_writer_matches_stream_zip(self) -> None:
+        entries = [("a.txt", b"a" * 70000), ("b.png", b"b" * 10)]
+        writer = ZipWriter()
+        chunks = [chunk for name, data in entries for chunk in writer.add(name, data)]
+        chunks += writer.finish()
+        self.assertEqual(b"".join(chunks), b"".join(stream_zip(entries)))
+
+    def test_zip64_entry_sizes(self) -> None:
+        # entries over the threshold get Zip64 headers and data descriptors
+        with mock.patch.object(zipstream, "_ZIP64_ENTRY_THRESHOLD", 100):
+            entries = [
+                ("big.bin", bytes(range(256)) * 4), ("big.png", b"p" * 500), ("small.txt", b"s"),
+            ]
+            data = b"".join(stream_zip(entries))
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertIsNone(archive.testzip())
+        for name, content in entries:
+            self.assertEqual(archive.read(name), content)
+        # Zip64 extra field (header id 1) only on the entries over the threshold
+        extras = [info.extra[:2] for info in archive.infolist()]
+        self.assertEqual(extras, [b"\x01\x00", b"\x01\x00", b""])
+
+    def test_zip64_entry_count(self) -> None:
+        # 0xFFFF entries: the classic end record's 16-bit count uses that
+        # value as its "see the Zip64 record" sentinel
+        entries = [(f"page{i}.png", b"") for i in range(0xFFFF)]
+        data = b"".join(stream_zip(entries))
+        self.assertIn(b"PK\x06\x06", data)  # Zip64 end of central directory
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertEqual(len(archive.infolist()), 0xFFFF)
+        self.assertEqual(archive.infolist()[-1].filename, "page65534.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+"""Bounded executor for CPU-bound extraction work in the web service.
+
+Jobs run on a thread or process pool so the event loop stays responsive.
+At most *max_jobs* run at once and at most *max_queue* wait for a slot;
+anything beyond that is rejected immediately with :class:`PoolFull` so the
+caller can answer 503 instead of piling up requests.
+
+:meth:`WorkPool.stream` runs a generator function on the pool and hands its
+items back to the event loop through a small bounded queue, so a response
+can start sending while the job is still producing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolFull(Exception):
+    """Raised when every slot is busy and the wait queue is full."""
+
+
+class Abandoned(Exception):
+    """Raised by :meth:`WorkPool.stream` when the caller went away before the first item."""
+
+
+# Items buffered between a streaming job and its consumer.
+_STREAM_BUFFER = 16
+# How often (seconds) stream() asks whether the caller is still there while
+# it waits for the first item.
+_DISCONNECT_POLL = 0.25
+
+_DONE = "done"
+_ITEM = "item"
+_ERROR = "error"
+
+
+def _pump(
+    gen_fn: Callable[..., Iterator[Any]], args: tuple, out, stop, stop_kwarg: str | None,
+) -> None:
+    """Run ``gen_fn(*args)`` and forward its items to *out* until *stop* is set."""
+
+    def put(message: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        gen = gen_fn(*args, **({stop_kwarg: stop} if stop_kwarg else {}))
+        try:
+            for item in gen:
+                if not put((_ITEM, item)):
+                    return
+        finally:
+            gen.close()
+    except BaseException as exc:  # forwarded to the consumer
+        put((_ERROR, exc))
+        return
+    put((_DONE, None))
+
+
+class WorkPool:
+    def __init__(self, *, kind: str = "thread", max_jobs: int = 2, max_queue: int = 8) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"unknown executor kind: {kind!r}")
+        if max_jobs < 1 or max_queue < 0:
+            raise ValueError("max_jobs must be >= 1 and max_queue >= 0")
+        self.kind = kind
+        self.max_jobs = max_jobs
+        self.max_queue = max_queue
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_jobs) if kind == "process" else ThreadPoolExecutor(max_jobs)
+        )
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._running = 0
+        self._waiting = 0
+        # counters for sizing instances
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._last_wait = 0.0
+        self._manager: Any = None
+
+    @property
+    def full(self) -> bool:
+        """True if a new job would be rejected with :class:`PoolFull` right now."""
+        return self._slots.locked() and self._waiting >= self.max_queue
+
+    async def _acquire(self, wait: bool = False) -> None:
+        if self.full and not wait:
+            self._rejected += 1
+            raise PoolFull()
+
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - queued_at
+        self._last_wait = waited
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._running += 1
+
+    def _release(self) -> None:
+        self._running -= 1
+        self._completed += 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the executor, waiting for a free slot.
+
+        Raises :class:`PoolFull` without waiting if the queue is already full.
+        """
+        await self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        finally:
+            self._release()
+
+    async def run_local(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Like :meth:`run`, but always on a thread in this process.
+
+        For work on objects that can't be sent to a worker process (an open
+        ``fitz.Document``); it still takes one of the pool's slots.
+        """
+        await self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._executor if self.kind == "thread" else None
+            return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+        finally:
+            self._release()
+
+    async def stream(
+        self,
+        gen_fn: Callable[..., Iterator[T]],
+        /,
+        *args: Any,
+        stop_kwarg: str | None = None,
+        disconnected: Callable[[], Awaitable[bool]] | None = None,
+        wait: bool = False,
+    ) -> AsyncIterator[T]:
+        """Run the generator ``gen_fn(*args)`` on the executor and iterate it here.
+
+        The slot is taken before returning (raising :class:`PoolFull` like
+        :meth:`run`) and held until the returned iterator is exhausted or
+        closed and the job has finished. The first item is fetched eagerly
+        so errors raised before the generator produces anything surface to
+        the caller directly.
+
+        Closing the iterator early tells the job to stop, but only takes
+        effect when the generator next yields. With *stop_kwarg*, the stop
+        event is also passed to *gen_fn* under that keyword so it can check
+        ``is_set()`` between steps of its own.
+
+        *disconnected* (e.g. ``request.is_disconnected``) is polled while
+        waiting for the first item; once it returns True the job is told to
+        stop and :class:`Abandoned` is raised.
+
+        With *wait*, the job waits for a slot even when the wait queue is
+        full instead of raising :class:`PoolFull`; for callers that already
+        bound how many jobs they start.
+        """
+        await self._acquire(wait)
+        stop = first = job = None
+        try:
+            if self.kind == "process":
+                if self._manager is None:
+                    self._manager = multiprocessing.Manager()
+                out = self._manager.Queue(_STREAM_BUFFER)
+                stop = self._manager.Event()
+            else:
+                out = queue.Queue(_STREAM_BUFFER)
+                stop = threading.Event()
+            loop = asyncio.get_running_loop()
+            job = loop.run_in_executor(
+                self._executor, _pump, gen_fn, args, out, stop, stop_kwarg,
+            )
+            getter = loop.run_in_executor(None, out.get)
+            while disconnected is not None and not (
+                await asyncio.wait({getter}, timeout=_DISCONNECT_POLL)
+            )[0]:
+                if await disconnected():
+                    break
+            else:
+                first = await getter
+        except BaseException:
+            # e.g. the request was cancelled while waiting for the first
+            # item; the job may still be running and holds the slot until
+            # it notices *stop*
+            if job is None:
+                self._release()
+            else:
+                self._stop(stop, out, job)
+            raise
+        if first is None:
+            self._stop(stop, out, job)
+            raise Abandoned()
+        if first[0] == _ERROR:
+            job.add_done_callback(lambda _: self._release())
+            raise first[1]
+        return self._drain(first, out, stop, job)
+
+    async def _drain(self, first: tuple, out, stop, job: asyncio.Future) -> AsyncIterator[Any]:
+        loop = asyncio.get_running_loop()
+        message = first
+        try:
+            while message[0] == _ITEM:
+                yield message[1]
+                message = await loop.run_in_executor(None, out.get)
+            if message[0] == _ERROR:
+                raise message[1]
+        finally:
+            self._stop(stop, out, job)
+
+    def _stop(self, stop, out, job: asyncio.Future) -> None:
+        """Tell a streaming *job* to stop and release its slot once it has."""
+        stop.set()
+        # wake a getter still blocked on an empty queue; the job stops
+        # putting once *stop* is set, so it would wait forever
+        try:
+            out.put_nowait((_DONE, None))
+        except queue.Full:
+            pass
+        # Not awaited: when the client disconnects the response task is
+        # cancelled and any await here would be cancelled too, leaking
+        # the slot. The job notices *stop* and finishes on its own.
+        job.add_done_callback(lambda _: self._release())
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of pool occupancy and queue wait times (seconds)."""
+        started = self._completed + self._running
+        return {
+            "executor": self.kind,
+            "max_jobs": self.max_jobs,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": self._waiting,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_seconds_avg": self._wait_total / started if started else 0.0,
+            "wait_seconds_max": self._wait_max,
+            "wait_seconds_last": self._last_wait,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
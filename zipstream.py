@@ -0,0 +1,222 @@
+"""Streaming ZIP writer.
+
+:func:`stream_zip` turns an iterable of ``(name, data)`` entries into ZIP
+archive bytes chunk by chunk, so a response can start before the last entry
+exists. Each entry is written with a data descriptor (general purpose flag
+bit 3) after its data, and Zip64 records are used once sizes, offsets or the
+entry count outgrow the classic 32-bit/16-bit fields.
+
+Formats that are already compressed (PNG, JPEG, JPEG 2000, ...) are stored
+as-is; running DEFLATE over them again costs CPU and saves nothing.
+
+:class:`ZipWriter` is the same writer driven entry by entry, for callers
+that receive entries from more than one source.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+
+_STORED = 0
+_DEFLATED = 8
+
+_FLAG_DATA_DESCRIPTOR = 0x0008
+_FLAG_UTF8 = 0x0800
+
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+
+_MAX_U16 = 0xFFFF
+_MAX_U32 = 0xFFFFFFFF
+# DEFLATE can grow incompressible input slightly, so switch to Zip64 early.
+_ZIP64_ENTRY_THRESHOLD = _MAX_U32 - (1 << 20)
+
+_CHUNK_SIZE = 1 << 16
+
+_PRECOMPRESSED_EXTS = frozenset({
+    "png", "jpg", "jpeg", "jpx", "jp2", "j2k", "jb2", "gif", "webp",
+})
+
+
+def is_precompressed(name: str) -> bool:
+    """True if *name* has an extension whose data doesn't benefit from DEFLATE."""
+    return name.rsplit(".", 1)[-1].lower() in _PRECOMPRESSED_EXTS
+
+
+def _dos_datetime(t: float) -> tuple[int, int]:
+    tm = time.localtime(t)
+    dos_time = (tm.tm_hour << 11) | (tm.tm_min << 5) | (tm.tm_sec // 2)
+    dos_date = (max(tm.tm_year - 1980, 0) << 9) | (tm.tm_mon << 5) | tm.tm_mday
+    return dos_time, dos_date
+
+
+def _chunks(data: bytes) -> Iterator[memoryview]:
+    view = memoryview(data)
+    for start in range(0, len(view), _CHUNK_SIZE):
+        yield view[start : start + _CHUNK_SIZE]
+
+
+class ZipWriter:
+    """Incremental form of :func:`stream_zip` for entries that are pushed in.
+
+    Call :meth:`add` for each entry and :meth:`finish` once; both return the
+    archive bytes to send next. Used when entries come from several
+    producers, e.g. a batch of documents extracted concurrently.
+    """
+
+    def __init__(self, *, compresslevel: int = 6) -> None:
+        self.compresslevel = compresslevel
+        self._dos_time, self._dos_date = _dos_datetime(time.time())
+        self._offset = 0
+        self._central: list[tuple[bytes, int, bool, int, int, int, int]] = []
+
+    def add(self, name: str, data: bytes) -> Iterator[bytes]:
+        """Yield the local header, data and data descriptor for one entry."""
+        name_bytes = name.encode("utf-8")
+        method = _STORED if is_precompressed(name) else _DEFLATED
+        zip64 = len(data) >= _ZIP64_ENTRY_THRESHOLD
+        header_offset = self._offset
+
+        # --- local file header (CRC and sizes follow in the data descriptor) ---
+        if zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+            size_field = _MAX_U32
+        else:
+            extra = b""
+            size_field = 0
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            _VERSION_ZIP64 if zip64 else _VERSION_DEFAULT,
+            _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+            method,
+            self._dos_time,
+            self._dos_date,
+            0,
+            size_field,
+            size_field,
+            len(name_bytes),
+            len(extra),
+        ) + name_bytes + extra
+        yield header
+        self._offset += len(header)
+
+        # --- entry data ---
+        crc = 0
+        compressed_size = 0
+        if method == _STORED:
+            for chunk in _chunks(data):
+                crc = zlib.crc32(chunk, crc)
+                yield bytes(chunk)
+            compressed_size = len(data)
+        else:
+            compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+            for chunk in _chunks(data):
+                crc = zlib.crc32(chunk, crc)
+                out = compressor.compress(chunk)
+                if out:
+                    compressed_size += len(out)
+                    yield out
+            out = compressor.flush()
+            compressed_size += len(out)
+            yield out
+        self._offset += compressed_size
+
+        # --- data descriptor ---
+        if zip64:
+            descriptor = struct.pack("<IIQQ", 0x08074B50, crc, compressed_size, len(data))
+        else:
+            descriptor = struct.pack("<IIII", 0x08074B50, crc, compressed_size, len(data))
+        yield descriptor
+        self._offset += len(descriptor)
+
+        self._central.append(
+            (name_bytes, method, zip64, crc, compressed_size, len(data), header_offset)
+        )
+
+    def finish(self) -> Iterator[bytes]:
+        """Yield the central directory and end records."""
+        dos_time, dos_date = self._dos_time, self._dos_date
+        central = self._central
+
+        # --- central directory ---
+        cd_offset = self._offset
+        cd_size = 0
+        for name_bytes, method, zip64, crc, compressed_size, size, header_offset in central:
+            zip64_fields: list[int] = []
+            if zip64:
+                zip64_fields += [size, compressed_size]
+            if header_offset >= _MAX_U32:
+                zip64_fields.append(header_offset)
+            extra = (
+                struct.pack(f"<HH{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields)
+                if zip64_fields
+                else b""
+            )
+            needs_zip64 = bool(zip64_fields)
+            record = struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50,
+                _VERSION_ZIP64 if needs_zip64 else _VERSION_DEFAULT,
+                _VERSION_ZIP64 if needs_zip64 else _VERSION_DEFAULT,
+                _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+                method,
+                dos_time,
+                dos_date,
+                crc,
+                _MAX_U32 if zip64 else compressed_size,
+                _MAX_U32 if zip64 else size,
+                len(name_bytes),
+                len(extra),
+                0,
+                0,
+                0,
+                0,
+                _MAX_U32 if header_offset >= _MAX_U32 else header_offset,
+            ) + name_bytes + extra
+            yield record
+            cd_size += len(record)
+
+        # --- end of central directory (with Zip64 records when needed) ---
+        count = len(central)
+        # the all-ones values are sentinels meaning "see the Zip64 record"
+        if count >= _MAX_U16 or cd_size >= _MAX_U32 or cd_offset >= _MAX_U32:
+            eocd64_offset = cd_offset + cd_size
+            yield struct.pack(
+                "<IQHHIIQQQQ",
+                0x06064B50,
+                44,
+                _VERSION_ZIP64,
+                _VERSION_ZIP64,
+                0,
+                0,
+                count,
+                count,
+                cd_size,
+                cd_offset,
+            )
+            yield struct.pack("<IIQI", 0x07064B50, 0, eocd64_offset, 1)
+            yield struct.pack(
+                "<IHHHHIIH",
+                0x06054B50,
+                0,
+                0,
+                min(count, _MAX_U16),
+                min(count, _MAX_U16),
+                min(cd_size, _MAX_U32),
+                min(cd_offset, _MAX_U32),
+                0,
+            )
+        else:
+            yield struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0)
+
+
+def stream_zip(entries: Iterable[tuple[str, bytes]], *, compresslevel: int = 6) -> Iterator[bytes]:
+    """Yield the bytes of a ZIP archive containing *entries*, in order."""
+    writer = ZipWriter(compresslevel=compresslevel)
+    for name, data in entries:
+        yield from writer.add(name, data)
+    yield from writer.finish()